@@ -1,14 +1,86 @@
 import os
+import asyncio
 import logging
+import importlib.util
 import certifi
-import ssl
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from app.database.monitoring import command_monitor, pool_monitor
+from app.database.indexes import DOCUMENT_MODELS
 
 logger = logging.getLogger(__name__)
 
+# Connection pool; unset values keep the driver defaults
+MONGO_MAX_POOL_SIZE = os.getenv("MONGO_MAX_POOL_SIZE")
+MONGO_MIN_POOL_SIZE = os.getenv("MONGO_MIN_POOL_SIZE")
+MONGO_MAX_IDLE_TIME_MS = os.getenv("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+# Comma separated, in order of preference, e.g. "zstd,snappy,zlib"
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+# Read routing for public pages that tolerate slightly stale data.
+# maxStalenessSeconds must be at least 90 when set; -1 disables it.
+PUBLIC_READ_PREFERENCE = os.getenv("PUBLIC_READ_PREFERENCE", "secondaryPreferred")
+PUBLIC_READ_MAX_STALENESS = int(os.getenv("PUBLIC_READ_MAX_STALENESS", "90"))
+PUBLIC_READ_CONCERN = os.getenv("PUBLIC_READ_CONCERN", "local")
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+# Python packages the optional wire compressors need
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
 # Global database instance
 db = None
+# (collection name, profile) -> collection with that profile's read options
+_read_collections = {}
+
+
+def pool_options() -> dict:
+    """Motor client keyword arguments for pool sizing and wire compression"""
+    options = {}
+    if MONGO_MAX_POOL_SIZE:
+        options["maxPoolSize"] = int(MONGO_MAX_POOL_SIZE)
+    if MONGO_MIN_POOL_SIZE:
+        options["minPoolSize"] = int(MONGO_MIN_POOL_SIZE)
+    if MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = int(MONGO_MAX_IDLE_TIME_MS)
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGO_WAIT_QUEUE_TIMEOUT_MS)
+
+    compressors = []
+    for name in filter(None, (part.strip() for part in MONGO_COMPRESSORS.split(","))):
+        module = COMPRESSOR_MODULES.get(name)
+        if module is None or importlib.util.find_spec(module) is None:
+            logger.warning(f"Mongo compressor {name} is not available, skipping it")
+            continue
+        compressors.append(name)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+
+def _public_read_options() -> dict:
+    mode = READ_PREFERENCES.get(PUBLIC_READ_PREFERENCE)
+    if mode is None:
+        logger.warning(f"Unknown PUBLIC_READ_PREFERENCE {PUBLIC_READ_PREFERENCE}, using primary")
+        mode = Primary
+    preference = mode() if mode is Primary else mode(max_staleness=PUBLIC_READ_MAX_STALENESS)
+    return {"read_preference": preference, "read_concern": ReadConcern(PUBLIC_READ_CONCERN)}
+
+
+# Named read profiles routes can opt into via get_read_collection()
+READ_PROFILES = {
+    "primary": lambda: {},
+    "public": _public_read_options,
+}
 
 async def init_db():
     global db
@@ -26,40 +98,34 @@ async def init_db():
             db_name = "gpcc_db"
         logger.info(f"Using database: {db_name}")
         
-        # Create a custom SSL context for Python 3.13 compatibility
-        ssl_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-        ssl_context.check_hostname = True
-        ssl_context.verify_mode = ssl.CERT_REQUIRED
-        ssl_context.load_verify_locations(certifi.where())
-        
-        # Create client with explicit SSL context
+        # Create client with certifi's CA bundle
         client = AsyncIOMotorClient(
             MONGO_URI,
-            serverSelectionTimeoutMS=20000,
+            serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
             tlsCAFile=certifi.where(),
             tlsAllowInvalidCertificates=True,
+            event_listeners=[command_monitor, pool_monitor],
+            **pool_options(),
         )
         
         # Get database
         db = client[db_name]
+        _read_collections.clear()
+        command_monitor.attach(asyncio.get_running_loop(), db)
         
-        # Initialize Beanie
+        # Events used to live in the default "Event" collection because of a
+        # typo in Event.Settings; move them to "events" once
+        existing = await db.list_collection_names(filter={"name": {"$in": ["Event", "events"]}})
+        if "Event" in existing and "events" not in existing:
+            await db["Event"].rename("events")
+            logger.info("Renamed collection Event to events")
+
+        # Initialize Beanie; indexes are built by sync_indexes() at startup (unique) and in the background
         await init_beanie(
             database=db,
-            document_models=[
-                "app.models.member_model.Member",
-                "app.models.event_model.Event",
-                "app.models.event_model.EventRegistration",
-                "app.models.event_model.VolunteerSignup",
-                "app.models.prayer_testimony_model.PrayerRequest",
-                "app.models.prayer_testimony_model.Testimony",
-                "app.models.settings_model.AttendanceSettings",
-                "app.models.announcement_model.Announcement"
-            ]
+            document_models=DOCUMENT_MODELS,
+            skip_indexes=True,
         )
-        
-        # Test connection
-        await client.admin.command('ping')
         logger.info("Successfully connected to MongoDB")
         return db
     except Exception as e:
@@ -75,4 +141,31 @@ async def init_db():
 def get_db():
     if db is None:
         raise RuntimeError("Database not initialized. Call init_db() first.")
-    return db
\ No newline at end of file
+    return db
+
+
+def get_collection(model):
+    """Raw Motor collection backing a Beanie document model"""
+    return get_db()[model.get_collection_name()]
+
+
+def get_read_collection(model, profile: str = "public"):
+    """Raw collection for reads routed by a named profile from READ_PROFILES"""
+    key = (model.get_collection_name(), profile)
+    collection = _read_collections.get(key)
+    if collection is None:
+        collection = get_collection(model).with_options(**READ_PROFILES[profile]())
+        _read_collections[key] = collection
+    return collection
+
+
+async def ping_db(timeout: float = 2.0) -> bool:
+    """True when MongoDB answers a ping within ``timeout`` seconds"""
+    if db is None:
+        return False
+    try:
+        await asyncio.wait_for(db.client.admin.command("ping"), timeout)
+        return True
+    except Exception as e:
+        logger.warning(f"MongoDB ping failed: {str(e)}")
+        return False
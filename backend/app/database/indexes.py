@@ -0,0 +1,158 @@
+import logging
+from typing import Dict, List, Type
+from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from app.models.member_model import Member
+from app.models.event_model import Event, EventRegistration, VolunteerSignup, WaitlistEntry
+from app.models.prayer_testimony_model import PrayerRequest, Testimony
+from app.models.settings_model import AttendanceSettings, SettingsVersion
+from app.models.announcement_model import Announcement
+from app.models.token_model import RefreshToken, RevokedToken
+from app.models.attendance_model import (
+    AttendanceBitmap, AttendanceBitmapMembers, AttendanceBitmapSnapshot, AttendanceCheckIn,
+    AttendanceDaily, AttendanceRollupRebuild,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every index the app relies on, per document model. Beanie is initialised
+# with skip_indexes=True and these are built by sync_indexes() instead.
+INDEXES: Dict[Type[Document], List[IndexModel]] = {
+    Member: [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("role", ASCENDING)], name="role"),
+        IndexModel(
+            [("token_version", ASCENDING)],
+            name="token_version_bumped",
+            partialFilterExpression={"token_version": {"$gt": 0}},
+        ),
+    ],
+    Event: [
+        # Keyset pagination walks (start_time, _id) within published events
+        IndexModel([("is_published", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+                   name="published_start_time_id"),
+        # Only events with someone waiting; the promoter's sweep reads these
+        IndexModel([("waitlist_count", ASCENDING)], name="waitlisted",
+                   partialFilterExpression={"waitlist_count": {"$gt": 0}}),
+    ],
+    EventRegistration: [
+        # One registration per member per event; rsvp_to_event relies on it
+        IndexModel([("event_id", ASCENDING), ("member_id", ASCENDING)],
+                   name="event_member_unique", unique=True),
+        IndexModel([("member_id", ASCENDING)], name="member"),
+    ],
+    WaitlistEntry: [
+        IndexModel([("event_id", ASCENDING), ("member_id", ASCENDING)],
+                   name="event_member_unique", unique=True),
+        IndexModel([("event_id", ASCENDING), ("position", ASCENDING)], name="event_position"),
+    ],
+    VolunteerSignup: [
+        IndexModel([("event_id", ASCENDING), ("member_id", ASCENDING), ("role", ASCENDING)],
+                   name="event_member_role"),
+    ],
+    PrayerRequest: [
+        IndexModel([("is_public", ASCENDING), ("is_approved", ASCENDING), ("created_at", DESCENDING)],
+                   name="public_approved_created"),
+    ],
+    Testimony: [
+        IndexModel([("is_approved", ASCENDING), ("created_at", DESCENDING)],
+                   name="approved_created"),
+    ],
+    AttendanceSettings: [],
+    SettingsVersion: [],
+    Announcement: [
+        IndexModel([("is_published", ASCENDING), ("expires_at", ASCENDING), ("created_at", DESCENDING)],
+                   name="published_expires_created"),
+        IndexModel([("target", ASCENDING), ("target_departments", ASCENDING)],
+                   name="target_departments"),
+    ],
+    AttendanceCheckIn: [
+        # One check-in per member per event; batched writes rely on it to dedupe
+        IndexModel([("member_id", ASCENDING), ("event_id", ASCENDING)],
+                   name="member_event_unique", unique=True),
+        IndexModel([("event_id", ASCENDING)], name="event"),
+        # The cohort index tails new check-ins by write time
+        IndexModel([("written_at", ASCENDING)], name="written_at"),
+    ],
+    AttendanceDaily: [
+        # One rollup row per key; reports range over day, the leading field
+        IndexModel([("day", ASCENDING), ("event_id", ASCENDING), ("role", ASCENDING),
+                    ("age_group", ASCENDING)], name="day_event_role_age_unique", unique=True),
+    ],
+    AttendanceRollupRebuild: [],
+    AttendanceBitmapSnapshot: [
+        IndexModel([("taken_at", DESCENDING)], name="taken_at"),
+    ],
+    AttendanceBitmap: [
+        IndexModel([("snapshot_id", ASCENDING)], name="snapshot"),
+    ],
+    AttendanceBitmapMembers: [
+        IndexModel([("snapshot_id", ASCENDING), ("offset", ASCENDING)], name="snapshot_offset"),
+    ],
+    RefreshToken: [
+        IndexModel([("jti", ASCENDING)], name="jti_unique", unique=True),
+        IndexModel([("family_id", ASCENDING)], name="family"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+    ],
+    RevokedToken: [
+        IndexModel([("expires_at", ASCENDING)], name="expires_ttl", expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+    ],
+}
+
+DOCUMENT_MODELS = list(INDEXES)
+
+# Collections whose rows sharing a unique key are plain repeats (an older
+# duplicate check let them through); all but the oldest are removed before
+# the unique index is built
+DEDUPED_MODELS = [EventRegistration, WaitlistEntry, AttendanceCheckIn]
+
+
+def _is_unique(index: IndexModel) -> bool:
+    return bool(index.document.get("unique"))
+
+
+async def dedupe_unique_keys(db) -> int:
+    """Delete repeated rows that would block the unique indexes of DEDUPED_MODELS"""
+    total = 0
+    for model in DEDUPED_MODELS:
+        collection = db[model.get_collection_name()]
+        removed = 0
+        for index in filter(_is_unique, INDEXES[model]):
+            key = {field.replace(".", "_"): f"${field}" for field in index.document["key"]}
+            cursor = collection.aggregate([
+                {"$sort": {"_id": 1}},
+                {"$group": {"_id": key, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+            ], allowDiskUse=True)
+            async for group in cursor:
+                result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+                removed += result.deleted_count
+        if removed:
+            logger.warning(f"Removed {removed} duplicate rows from {model.get_collection_name()}")
+        total += removed
+    return total
+
+
+async def sync_indexes(db, unique_only: bool = False) -> bool:
+    """Create every declared index; existing identical indexes are a no-op.
+
+    Each collection is synced independently so one conflict (for example
+    duplicate emails blocking the unique index) does not stop the rest.
+    With ``unique_only`` just the unique indexes are built, the ones writes
+    rely on for correctness. Returns True when every collection synced cleanly.
+    """
+    ok = True
+    for model, indexes in INDEXES.items():
+        if unique_only:
+            indexes = [index for index in indexes if _is_unique(index)]
+        if not indexes:
+            continue
+        collection = model.get_collection_name()
+        try:
+            await db[collection].create_indexes(indexes)
+        except Exception as e:
+            ok = False
+            logger.error(f"Index sync failed for {collection}: {str(e)}")
+    logger.info("Index sync complete" if ok else "Index sync finished with errors")
+    return ok
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+from pymongo import monitoring
+from app.utils.metrics import (mongo_commands_total,
+                               mongo_pool_checkout_failures,
+                               mongo_pool_connections,
+                               mongo_pool_wait)
+from app.utils.request_context import request_stats_var, get_request_id
+
+logger = logging.getLogger(__name__)
+
+MONGO_SLOW_MS = float(os.getenv("MONGO_SLOW_MS", "100"))
+MONGO_QUERY_BUDGET = int(os.getenv("MONGO_QUERY_BUDGET", "10"))
+# How often the same slow query shape may be explained
+EXPLAIN_INTERVAL_SECONDS = int(os.getenv("MONGO_EXPLAIN_INTERVAL_SECONDS", "600"))
+
+# Commands whose filter is worth logging and explaining when slow
+FILTERED_COMMANDS = {"find", "aggregate", "count", "distinct", "delete", "update", "findAndModify"}
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count"}
+IGNORED_COMMANDS = {"explain", "ping", "hello", "isMaster", "ismaster", "endSessions"}
+
+
+def query_shape(value):
+    """A filter with every literal replaced by its type, for grouping queries"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(item) for item in value[:3]]
+    return type(value).__name__
+
+
+def summarize_plan(explain: dict) -> str:
+    """Winning plan as ``FETCH <- IXSCAN(email_1)``"""
+    plan = explain.get("queryPlanner", {}).get("winningPlan")
+    if plan is None and explain.get("stages"):
+        plan = explain["stages"][0].get("$cursor", {}).get("queryPlanner", {}).get("winningPlan")
+    stages = []
+    while plan:
+        plan = plan.get("queryPlan", plan)
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " <- ".join(stages) or "unknown"
+
+
+def _command_filter(command_name: str, command: dict):
+    if command_name in ("find", "count", "distinct"):
+        return command.get("filter", command.get("query", {}))
+    if command_name == "aggregate":
+        return command.get("pipeline", [])
+    if command_name == "delete":
+        return [statement.get("q", {}) for statement in command.get("deletes", [])[:1]]
+    if command_name == "update":
+        return [statement.get("q", {}) for statement in command.get("updates", [])[:1]]
+    if command_name == "findAndModify":
+        return command.get("query", {})
+    return None
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Counts MongoDB commands and attributes them to the current request.
+
+    Motor copies the caller's context into its executor threads, so the
+    request's ``RequestStats`` is visible here even though pymongo invokes
+    listeners off the event loop. Those threads run concurrently, so every
+    counter and the pending map are updated under ``lock``. Commands slower than ``MONGO_SLOW_MS`` are
+    logged with their filter shape, and an ``explain`` of the same query is
+    run in the background (at most once per shape per interval).
+    """
+
+    def __init__(self, slow_ms=100.0, explain_interval=600):
+        self.slow_ms = slow_ms
+        self.explain_interval = explain_interval
+        self.pending = {}  # (request_id, connection_id) -> (name, db, collection, filter)
+        self.explained = {}  # shape key -> last explain time
+        self.captures: List[list] = []
+        self.lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.db = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop, db):
+        """Give the monitor a loop and database to run explains on"""
+        self.loop = loop
+        self.db = db
+
+    def started(self, event):
+        name = event.command_name
+        if name in IGNORED_COMMANDS:
+            return
+        pending = None
+        if name in FILTERED_COMMANDS:
+            pending = (name, event.database_name, event.command.get(name),
+                       _command_filter(name, event.command))
+        with self.lock:
+            for captured in self.captures:
+                captured.append(name)
+            if pending is not None:
+                self.pending[(event.request_id, event.connection_id)] = pending
+
+    def succeeded(self, event):
+        self._record(event, "success")
+
+    def failed(self, event):
+        self._record(event, "failure")
+
+    def _record(self, event, outcome: str):
+        duration_ms = event.duration_micros / 1000
+        stats = request_stats_var.get()
+        with self.lock:
+            mongo_commands_total.inc(event.command_name, outcome)
+            pending = self.pending.pop((event.request_id, event.connection_id), None)
+            if event.command_name in IGNORED_COMMANDS:
+                return
+            if stats is not None:
+                stats.mongo_commands += 1
+                stats.mongo_time_ms += duration_ms
+
+        if pending is not None and duration_ms >= self.slow_ms:
+            self._log_slow(pending, duration_ms)
+
+    def _log_slow(self, pending, duration_ms: float):
+        name, db_name, collection, command_filter = pending
+        shape = query_shape(command_filter)
+        logger.warning(
+            f"Slow Mongo {name} on {collection}: {duration_ms:.1f}ms "
+            f"shape={shape} [{get_request_id()}]"
+        )
+        if name not in EXPLAINABLE_COMMANDS or self.loop is None or self.db is None:
+            return
+
+        key = f"{name}:{collection}:{shape}"
+        now = time.monotonic()
+        with self.lock:
+            if now - self.explained.get(key, -self.explain_interval) < self.explain_interval:
+                return
+            self.explained[key] = now
+        self.loop.call_soon_threadsafe(
+            lambda: self.loop.create_task(self._explain(name, collection, command_filter, key))
+        )
+
+    async def _explain(self, name: str, collection: str, command_filter, key: str):
+        if name == "aggregate":
+            command = {"aggregate": collection, "pipeline": command_filter, "cursor": {}}
+        elif name == "count":
+            command = {"count": collection, "query": command_filter}
+        else:
+            command = {"find": collection, "filter": command_filter}
+        try:
+            explain = await self.db.command({"explain": command, "verbosity": "queryPlanner"})
+            logger.warning(f"Plan for slow {key}: {summarize_plan(explain)}")
+        except Exception as e:
+            logger.warning(f"Could not explain slow {key}: {str(e)}")
+
+    @contextmanager
+    def capture(self):
+        """Collect the names of every command issued inside the block"""
+        captured = []
+        with self.lock:
+            self.captures.append(captured)
+        try:
+            yield captured
+        finally:
+            with self.lock:
+                self.captures.remove(captured)
+
+
+command_monitor = CommandMonitor(slow_ms=MONGO_SLOW_MS, explain_interval=EXPLAIN_INTERVAL_SECONDS)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Feeds connection pool checkout waits and sizes into the metrics registry.
+
+    A growing ``mongo_pool_wait_seconds`` tail with ``checked_out`` pinned at
+    MONGO_MAX_POOL_SIZE means the pool is too small for the load. Events
+    arrive on pymongo's threads, so metric updates happen under ``lock``.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        logger.warning(f"Mongo connection pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self.lock:
+            mongo_pool_connections.inc("open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self.lock:
+            mongo_pool_connections.dec("open")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            mongo_pool_checkout_failures.inc(str(event.reason))
+            if event.duration is not None:
+                mongo_pool_wait.observe(value=event.duration)
+
+    def connection_checked_out(self, event):
+        with self.lock:
+            mongo_pool_connections.inc("checked_out")
+            if event.duration is not None:
+                mongo_pool_wait.observe(value=event.duration)
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            mongo_pool_connections.dec("checked_out")
+
+
+pool_monitor = PoolMonitor()
+
+
+def query_budget(max_commands: int):
+    """Route decorator: the most Mongo commands one call should need"""
+    def decorator(func):
+        func.__query_budget__ = max_commands
+        return func
+    return decorator
+
+
+def route_query_budget(endpoint) -> int:
+    return getattr(endpoint, "__query_budget__", MONGO_QUERY_BUDGET)
+
+
+@contextmanager
+def assert_max_commands(max_commands: int):
+    """Test helper: fail if the block issues more than ``max_commands`` commands.
+
+        with assert_max_commands(3):
+            client.post(f"/events/{event_id}/register", headers=auth)
+    """
+    with command_monitor.capture() as captured:
+        yield captured
+    if len(captured) > max_commands:
+        raise AssertionError(
+            f"Expected at most {max_commands} Mongo commands, got {len(captured)}: {captured}"
+        )
@@ -1,10 +1,14 @@
 from fastapi import Depends, HTTPException, status
-from app.utils.auth import get_current_active_user, get_current_user
-from app.models.member_model import Member
+from app.utils.auth import (get_current_active_user,
+                            get_current_user,
+                            get_current_principal,
+                            get_active_principal)
+from app.schemas.auth_schema import Principal
 
-__all__ = ["get_current_user", "get_current_active_user", "require_admin"]
+__all__ = ["get_current_user", "get_current_active_user", "get_current_principal",
+           "get_active_principal", "require_admin"]
 
-def require_admin(current_user: Member = Depends(get_current_user)):
+def require_admin(current_user: Principal = Depends(get_current_principal)):
     if current_user.role not in ["Admin", "Staff"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
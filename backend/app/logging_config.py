@@ -0,0 +1,134 @@
+import json
+import logging
+import os
+import random
+import sys
+from datetime import datetime
+from logging.handlers import (QueueHandler,
+                              QueueListener,
+                              RotatingFileHandler,
+                              TimedRotatingFileHandler)
+from queue import SimpleQueue
+from typing import Optional
+from app.utils.request_context import get_request_id
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Structured fields copied into JSON output when a record carries them
+EXTRA_FIELDS = ("request_id", "method", "path", "route", "status_code", "duration_ms", "client_ip")
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id before they leave the loop"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = get_request_id()
+        return True
+
+
+class AccessLogSampler(logging.Filter):
+    """Keep a fraction of successful, fast access-log lines.
+
+    Records flagged ``access`` with a status below 400 and a duration under
+    ``slow_ms`` are kept with probability ``sample_rate``; errors, slow
+    requests and every other record always pass.
+    """
+    def __init__(self, sample_rate=1.0, slow_ms=1000.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1.0 or not getattr(record, "access", False):
+            return True
+        if getattr(record, "status_code", 500) >= 400:
+            return True
+        if getattr(record, "duration_ms", 0.0) >= self.slow_ms:
+            return True
+        return random.random() < self.sample_rate
+
+
+def setup_logging() -> QueueListener:
+    """Route all logging through a queue so I/O happens on a listener thread.
+
+    Request handlers only pay for a ``QueueHandler`` put; a ``QueueListener``
+    thread writes to stdout and a rotating file. Configured from the
+    environment: LOG_LEVEL, LOG_FORMAT (text or json), LOG_FILE, LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT, LOG_ROTATE_WHEN (e.g. "midnight" for time-based
+    rotation), LOG_SAMPLE_RATE and LOG_SLOW_MS.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = os.getenv("LOG_FILE", "app.log")
+    if log_file:
+        rotate_when = os.getenv("LOG_ROTATE_WHEN")
+        backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+        if rotate_when:
+            handlers.append(TimedRotatingFileHandler(
+                log_file, when=rotate_when, backupCount=backup_count, utc=True
+            ))
+        else:
+            handlers.append(RotatingFileHandler(
+                log_file,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                backupCount=backup_count,
+            ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(AccessLogSampler(
+        sample_rate=float(os.getenv("LOG_SAMPLE_RATE", "1.0")),
+        slow_ms=float(os.getenv("LOG_SLOW_MS", "1000")),
+    ))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,60 +1,176 @@
 
+import os
 import time
+import uuid
 import logging
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-import json
+from app.utils.request_context import request_id_var, request_stats_var, RequestStats
+from app.utils.metrics import (http_request_duration,
+                               http_requests_total,
+                               http_requests_in_flight,
+                               mongo_commands_per_request,
+                               mongo_query_budget_exceeded)
+from app.database.monitoring import route_query_budget
 
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all incoming requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next):
-        # Log request details
-        start_time = time.time()
-        client_ip = request.client.host if request.client else "unknown"
-        
+# Bytes of a request body shown in debug logs
+BODY_LOG_LIMIT = 500
+
+
+class LoggingMiddleware:
+    """Pure ASGI middleware to log all incoming requests and responses.
+
+    Unlike ``BaseHTTPMiddleware`` it adds no extra task or memory stream per
+    request and never buffers the body: when debug logging is on, the first
+    ``BODY_LOG_LIMIT`` bytes are copied as the app itself reads them.
+    """
+    def __init__(self, app, skip_paths=("/health",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
         # Skip health checks in production to reduce log noise
-        if request.url.path == "/health":
-            return await call_next(request)
-        
-        logger.info(f"Request: {request.method} {request.url.path} "
-                   f"from {client_ip}")
-        
-        # Log query parameters
-        if request.query_params:
-            logger.debug(f"Query params: {dict(request.query_params)}")
-        
-        # Log body for non-GET requests
-        if request.method not in ["GET", "HEAD"]:
-            try:
-                body = await request.body()
-                if body:
-                    # Truncate long bodies to prevent log flooding
-                    body_str = body.decode()[:500] + "..." if len(body) > 500 else body.decode()
-                    logger.debug(f"Request body: {body_str}")
-            except Exception as e:
-                logger.warning(f"Failed to read request body: {str(e)}")
-        
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        logger.debug(f"Request: {method} {path} from {client_ip}")
+
+        if logger.isEnabledFor(logging.DEBUG):
+            if scope.get("query_string"):
+                logger.debug(f"Query params: {scope['query_string'].decode('latin-1')}")
+            if method not in ("GET", "HEAD"):
+                receive = _peek_body(receive)
+
+        status_code = 500
+        request_id_header = (b"x-request-id", request_id.encode("latin-1"))
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", ()), request_id_header]}
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
             # Log exceptions with traceback
             logger.error(f"Request error: {str(e)}", exc_info=True)
             raise
-        
-        # Calculate processing time
-        process_time = (time.time() - start_time) * 1000
-        formatted_time = f"{process_time:.2f}ms"
-        
-        # Log response details
-        logger.info(f"Response: {response.status_code} (Time: {formatted_time})")
-        return response
+        finally:
+            request_id_var.reset(token)
+
+        # Log response details; one line per request, sampled under load
+        process_time = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"{method} {path} from {client_ip} -> {status_code} (Time: {process_time:.2f}ms)",
+            extra={
+                "access": True,
+                "request_id": request_id,
+                "method": method,
+                "path": path,
+                "client_ip": client_ip,
+                "status_code": status_code,
+                "duration_ms": round(process_time, 2),
+            },
+        )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency, status and Mongo usage.
+
+    Routes are labelled by their template (``/events/{event_id}``), not the
+    raw path, so label cardinality stays bounded. With ``server_timing`` the
+    response also carries a ``Server-Timing`` header.
+    """
+    def __init__(self, app, server_timing=None, skip_paths=("/metrics",)):
+        self.app = app
+        if server_timing is None:
+            server_timing = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+        self.server_timing = server_timing
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        stats = RequestStats()
+        token = request_stats_var.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    elapsed = (time.perf_counter() - start_time) * 1000
+                    timing = (f"app;dur={elapsed:.1f}, "
+                              f"db;desc=\"mongo x{stats.mongo_commands}\";dur={stats.mongo_time_ms:.1f}")
+                    message = {**message, "headers": [*message.get("headers", ()),
+                                                      (b"server-timing", timing.encode())]}
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            http_requests_in_flight.dec()
+            request_stats_var.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_request_duration.observe(method, route, value=time.perf_counter() - start_time)
+            http_requests_total.inc(method, route, str(status_code))
+            mongo_commands_per_request.observe(route, value=stats.mongo_commands)
+            budget = route_query_budget(scope.get("endpoint"))
+            if stats.mongo_commands > budget:
+                mongo_query_budget_exceeded.inc(route)
+                logger.warning(f"{method} {route} issued {stats.mongo_commands} Mongo commands "
+                               f"(budget {budget})")
+
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _peek_body(receive):
+    """Wrap ``receive`` to log the start of the body without consuming it"""
+    seen = bytearray()
+    logged = False
+
+    async def receive_and_log():
+        nonlocal logged
+        message = await receive()
+        if not logged and message["type"] == "http.request":
+            seen.extend(message.get("body", b"")[:BODY_LOG_LIMIT + 1 - len(seen)])
+            if len(seen) > BODY_LOG_LIMIT or not message.get("more_body", False):
+                logged = True
+                if seen:
+                    # Truncate long bodies to prevent log flooding
+                    body_str = seen[:BODY_LOG_LIMIT].decode(errors="replace")
+                    suffix = "..." if len(seen) > BODY_LOG_LIMIT else ""
+                    logger.debug(f"Request body: {body_str}{suffix}")
+        return message
+
+    return receive_and_log
+
 
 # If you want to keep the function-based approach
 def log_requests(app):
     """Add logging middleware to the application"""
     app.add_middleware(LoggingMiddleware)
-    return app
\ No newline at end of file
+    return app
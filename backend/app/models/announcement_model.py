@@ -1,5 +1,6 @@
 from datetime import datetime
-from beanie import Document
+from beanie import Document, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from app.utils.cache import invalidate_tags
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum
@@ -30,7 +31,9 @@ class Announcement(Document):
     
     class Settings:
         name = "announcements"
-        indexes = [
-            [("is_published", 1), ("expires_at", 1), ("created_at", -1)],
-            [("target", 1), ("target_departments", 1)],
-        ]
\ No newline at end of file
+
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cached_reads(self):
+        # Every audience's list includes "all" and "members" announcements, and a
+        # write may have moved one between audiences, so all lists go together
+        await invalidate_tags("announcements")
\ No newline at end of file
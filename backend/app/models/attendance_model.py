@@ -1,7 +1,7 @@
 from beanie import Document
 from datetime import datetime
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 
 
 class AttendanceCheckIn(Document):
@@ -10,6 +10,69 @@ class AttendanceCheckIn(Document):
     check_in_time: datetime = Field(default_factory=datetime.utcnow)
     role: str
     age_group: Optional[str] = None
+    # Stamped by the app just before the insert; rollup rebuilds split on it
+    written_at: Optional[datetime] = None
 
     class Settings:
-        name = "attendance_records"
\ No newline at end of file
+        name = "attendance_records"
+
+class AttendanceDaily(Document):
+    """Check-ins per day, event, role and age group; kept current by every write"""
+    day: datetime
+    event_id: str
+    role: str
+    age_group: Optional[str] = None
+    checkins: int = 0
+
+    class Settings:
+        name = "attendance_daily"
+
+
+class AttendanceRollupRebuild(Document):
+    """Lease taken while the daily rollups are rebuilt.
+
+    Check-ins in the rebuilt days written from ``cutoff`` (until ``until``
+    once the rebuild is over) are counted by the rebuild, not incremented.
+    """
+    id: str
+    running: bool = False
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    cutoff: Optional[datetime] = None
+    until: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Settings:
+        name = "attendance_rollup_rebuilds"
+
+
+class AttendanceBitmapSnapshot(Document):
+    """Manifest of a persisted cohort index; written after its bitmaps and member chunks"""
+    taken_at: datetime
+    synced_to: datetime
+    members: int = 0
+    services: int = 0
+
+    class Settings:
+        name = "attendance_bitmap_snapshots"
+
+
+class AttendanceBitmapMembers(Document):
+    """A slice of a snapshot's member ids; bit i stands for the member at ordinal i"""
+    snapshot_id: str
+    offset: int
+    members: List[str] = []
+
+    class Settings:
+        name = "attendance_bitmap_members"
+
+
+class AttendanceBitmap(Document):
+    """Who attended one service, as a little-endian bitset of member ordinals"""
+    snapshot_id: str
+    event_id: str
+    first_check_in: datetime
+    bits: bytes
+
+    class Settings:
+        name = "attendance_bitmaps"
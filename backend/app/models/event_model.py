@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional, List
-from beanie import Document
+from beanie import Document, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from app.utils.cache import invalidate_tags
 from pydantic import Field
 
 class Event(Document):
@@ -15,15 +16,22 @@ class Event(Document):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     registration_required: bool = False
     max_attendees: Optional[int] = None
+    # Seats taken; only ever changed with a conditional $inc (see rsvp_to_event)
+    registered_count: int = 0
+    # Last waitlist position handed out, and members currently waiting
+    waitlist_seq: int = 0
+    waitlist_count: int = 0
     volunteers_needed: bool = False
     volunteer_roles: List[str] = [] # e.g ['choir', ''usher]
-    
-     
 
 
-    class Setting:
+    class Settings:
         name = "events"
 
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cached_reads(self):
+        await invalidate_tags("events", f"event:{self.id}")
+
 class EventRegistration(Document):
     event_id: str
     member_id: str
@@ -36,6 +44,18 @@ class EventRegistration(Document):
         name = "event_registrations"
 
 
+class WaitlistEntry(Document):
+    event_id: str
+    member_id: str
+    member_name: str
+    role: str
+    position: int  # FIFO order within the event
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "waitlist_entries"
+
+
 class VolunteerSignup(Document):
     event_id: str
     member_id: str
@@ -2,9 +2,7 @@ from beanie import Document, Indexed
 from pydantic import EmailStr, Field, validator
 from typing import Optional, List
 from datetime import datetime
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.hashing import hashing_pool, pwd_context
 
 VALID_ROLES = ["Member", "Usher", "Choir", "Deacon", "Staff", "Admin"]
 
@@ -21,6 +19,7 @@ class Member(Document):
 
     notification_preference: str = Field("both", description="Preferred notification: email, sms, or both")
     sms_opt_in: bool = Field(False, description="Explicit consent for SMS notifications")
+    token_version: int = Field(0, description="Bumped to invalidate previously issued tokens")
 
 
     @validator("role")
@@ -40,4 +39,12 @@ class Member(Document):
     
     def verify_password(self, password: str) -> bool:
         """Verify a password against the stored hash"""
-        return pwd_context.verify(password, self.password_hash)
\ No newline at end of file
+        return pwd_context.verify(password, self.password_hash)
+
+    async def set_password_async(self, password: str):
+        """Hash and set the password without blocking the event loop"""
+        self.password_hash = await hashing_pool.hash(password)
+
+    async def verify_password_async(self, password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await hashing_pool.verify(password, self.password_hash)
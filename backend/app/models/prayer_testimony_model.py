@@ -1,4 +1,5 @@
-from beanie import Document
+from beanie import Document, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from app.utils.cache import invalidate_tags
 from datetime import datetime
 from pydantic import Field, BaseModel
 from typing import List, Optional
@@ -24,6 +25,10 @@ class PrayerRequest(Document):
     class Settings:
         name = "prayer_requests"
 
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cached_reads(self):
+        await invalidate_tags("prayer_requests", f"prayer_request:{self.id}")
+
 
 class Testimony(Document):
     member_id: str
@@ -34,4 +39,8 @@ class Testimony(Document):
     comments: List[Comment] = []
 
     class Settings:
-        name = "testimonies"
\ No newline at end of file
+        name = "testimonies"
+
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cached_reads(self):
+        await invalidate_tags("testimonies", f"testimony:{self.id}")
\ No newline at end of file
@@ -1,4 +1,5 @@
 from beanie import Document
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 
@@ -9,4 +10,12 @@ class AttendanceSettings(Document):
         name = "attendance_settings"
 
 
-        
\ No newline at end of file
+class SettingsVersion(Document):
+    """Counter bumped on every settings write; workers poll it to know when to reload"""
+    # A single document whose _id is "settings", not an ObjectId
+    id: str
+    version: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "settings_versions"
@@ -0,0 +1,26 @@
+from beanie import Document
+from datetime import datetime
+from pydantic import Field
+from typing import Optional
+
+
+class RefreshToken(Document):
+    jti: str
+    family_id: str  # All tokens rotated from one login share a family
+    member_id: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    used_at: Optional[datetime] = None  # Set once rotated; a second use is reuse
+    revoked: bool = False
+
+    class Settings:
+        name = "refresh_tokens"
+
+
+class RevokedToken(Document):
+    token_id: str  # Access token jti, refresh family id or deleted member id
+    expires_at: datetime  # After this the token is dead anyway
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "revoked_tokens"
@@ -5,13 +5,14 @@ from datetime import datetime
 from bson import ObjectId
 
 from app.models.announcement_model import Announcement
-from app.models.member_model import Member
+from app.schemas.auth_schema import Principal
 from app.schemas.announcement_schema import (
     AnnouncementCreate, 
     AnnouncementUpdate, 
     AnnouncementResponse
 )
 from app.dependencies import require_admin
+from app.database.monitoring import query_budget
 
 router = APIRouter()
 
@@ -19,7 +20,7 @@ router = APIRouter()
 @router.post("", response_model=AnnouncementResponse)
 async def create_announcement(
     announcement: AnnouncementCreate,
-    current_user: Member = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Create a new announcement (Admin only)"""
     db_announcement = Announcement(
@@ -37,7 +38,7 @@ async def create_announcement(
 
 @router.get("", response_model=List[AnnouncementResponse])
 async def get_announcements(
-    current_user: Member = Depends(require_admin),
+    current_user: Principal = Depends(require_admin),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     published_only: bool = Query(False)
@@ -63,7 +64,7 @@ async def get_announcements(
 @router.get("/{id}", response_model=AnnouncementResponse)
 async def get_announcement(
     id: str,
-    current_user: Member = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Get a specific announcement (Admin only)"""
     announcement = await Announcement.get(id)
@@ -78,10 +79,11 @@ async def get_announcement(
     )
 
 @router.put("/{id}", response_model=AnnouncementResponse)
+@query_budget(3)
 async def update_announcement(
     id: str,
     announcement: AnnouncementUpdate,
-    current_user: Member = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Update an announcement (Admin only)"""
     db_announcement = await Announcement.get(id)
@@ -108,7 +110,7 @@ async def update_announcement(
 @router.delete("/{id}")
 async def delete_announcement(
     id: str,
-    current_user: Member = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete an announcement (Admin only)"""
     announcement = await Announcement.get(id)
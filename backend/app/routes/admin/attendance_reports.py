@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas.attendance_schema import AttendanceReport, AttendanceReportRequest, CohortOut
+from app.utils.attendance_rollup import attendance_report, rebuild_rollups
+from app.utils.cohorts import cohort_index
+from app.utils.event_window import utc_naive
+from app.utils.serialization import model_response
+
+
+router = APIRouter(tags=["Admin - Attendance Reports"])
+
+
+@router.post("/report", response_model=AttendanceReport)
+async def get_attendance_report(report: AttendanceReportRequest):
+    """Attendance between two dates, read from the daily rollups"""
+    if report.end_date < report.start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    result = await attendance_report(
+        report.start_date, report.end_date, report.role, report.age_group, report.interval
+    )
+    return model_response(AttendanceReport, AttendanceReport.model_validate(result))
+
+
+@router.post("/report/rebuild")
+async def rebuild_attendance_rollups(start_date: Optional[datetime] = None,
+                                     end_date: Optional[datetime] = None):
+    """Recompute the daily rollups from raw check-ins, for a range of days or all"""
+    rollups = await rebuild_rollups(start_date, end_date)
+    return {"message": "Attendance rollups rebuilt", "rollups": rollups}
+
+
+@router.get("/cohorts/regulars", response_model=CohortOut)
+async def get_regular_attenders(attended: int = Query(3, ge=1), of: int = Query(8, ge=1, le=520)):
+    """Members at `attended` or more of the last `of` services"""
+    if attended > of:
+        raise HTTPException(status_code=400, detail="attended cannot exceed of")
+    return model_response(CohortOut, CohortOut.model_validate(cohort_index.attended_at_least(attended, of)))
+
+
+@router.get("/cohorts/streak", response_model=CohortOut)
+async def get_attendance_streak(services: int = Query(4, ge=1, le=520)):
+    """Members at every one of the last `services` services"""
+    return model_response(CohortOut, CohortOut.model_validate(cohort_index.streak(services)))
+
+
+@router.get("/cohorts/first-timers", response_model=CohortOut)
+async def get_first_timers(start: Optional[datetime] = Query(None, alias="from"),
+                           end: Optional[datetime] = Query(None, alias="to")):
+    """Members whose first ever check-in falls in the range; defaults to this month"""
+    now = datetime.utcnow()
+    start = utc_naive(start) if start else now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = utc_naive(end) if end else now + timedelta(days=1)
+    return model_response(CohortOut, CohortOut.model_validate(cohort_index.first_timers(start, end)))
+
+
+@router.get("/cohorts/lapsed", response_model=CohortOut)
+async def get_lapsed_members(weeks: int = Query(6, ge=1), lookback_weeks: int = Query(26, ge=0)):
+    """Members absent for `weeks` weeks who attended in the `lookback_weeks` before (0: ever)"""
+    since = datetime.utcnow() - timedelta(weeks=weeks)
+    lookback_start = since - timedelta(weeks=lookback_weeks) if lookback_weeks else None
+    return model_response(CohortOut, CohortOut.model_validate(cohort_index.lapsed(since, lookback_start)))
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from beanie import PydanticObjectId
-from app.models.event_model import Event, EventRegistration, VolunteerSignup
+from app.models.event_model import Event, EventRegistration, VolunteerSignup, WaitlistEntry
 from app.schemas.event_schema import (EventCreate,
                                       EventUpdate,
                                       EventOut,
                                       RegistrationOut,
                                       VolunteerSignupOut)
+from app.utils.event_window import refresh_event_window
+from app.utils.registrations import waitlist_promoter
+from app.database.connection import get_collection
+from pymongo import UpdateOne
 from bson import ObjectId
+from typing import Optional
 
 router = APIRouter()
 
@@ -15,6 +20,7 @@ async def create_event(event_data: EventCreate):
     new_event = Event(**event_data.dict())
     
     await new_event.insert()
+    await refresh_event_window()
 
     event_dict = new_event.dict()
     event_dict["id"] = str(event_dict["id"])
@@ -33,6 +39,10 @@ async def update_event(event_id: PydanticObjectId, event_data: EventUpdate):
     # Update the event
     update_data = event_data.dict(exclude_unset=True)
     await event.set(update_data)
+    await refresh_event_window()
+    if "max_attendees" in update_data:
+        # More seats may have opened for the waitlist
+        waitlist_promoter.notify(event_id)
     
     # Convert to dict and handle ID
     event_dict = event.dict()
@@ -48,10 +58,71 @@ async def delete_event(event_id: PydanticObjectId):
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     await event.delete()
+    await refresh_event_window()
     return {"message": "Event deleted"}
 
 
 
+async def _rebuild_count(source, match: dict, field: str, event_id=None) -> int:
+    """Set ``field`` on events to the number of ``source`` docs per event_id"""
+    if event_id:
+        match = {**match, "event_id": str(event_id)}
+    rows = await get_collection(source).aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$event_id", "count": {"$sum": 1}}},
+    ]).to_list(None)
+
+    events = get_collection(Event)
+    counts = {ObjectId(row["_id"]): row["count"] for row in rows if ObjectId.is_valid(row["_id"])}
+    if counts:
+        await events.bulk_write([
+            UpdateOne({"_id": _id}, {"$set": {field: count}})
+            for _id, count in counts.items()
+        ], ordered=False)
+    # Events with none at all
+    empty = {"_id": {"$nin": list(counts)}}
+    if event_id:
+        empty["_id"]["$eq"] = event_id
+    await events.update_many(empty, {"$set": {field: 0}})
+    return len(counts)
+
+
+@router.post("/recount")
+async def recount_registrations(event_id: Optional[PydanticObjectId] = None):
+    """Rebuild registered_count and waitlist_count, for one event or all"""
+    registered = await _rebuild_count(
+        EventRegistration, {"status": {"$ne": "cancelled"}}, "registered_count", event_id
+    )
+    waitlisted = await _rebuild_count(WaitlistEntry, {}, "waitlist_count", event_id)
+    return {
+        "message": "Registration counts rebuilt",
+        "events": registered,
+        "waitlisted_events": waitlisted,
+    }
+
+
+
+@router.get("/waitlists")
+async def view_waitlist_depths():
+    """Events with members waiting, deepest waitlist first"""
+    events = await get_collection(Event).find(
+        {"waitlist_count": {"$gt": 0}},
+        {"title": 1, "start_time": 1, "max_attendees": 1, "registered_count": 1, "waitlist_count": 1},
+    ).sort("waitlist_count", -1).to_list(None)
+    return [
+        {
+            "event_id": str(event["_id"]),
+            "title": event.get("title"),
+            "start_time": event.get("start_time"),
+            "max_attendees": event.get("max_attendees"),
+            "registered_count": event.get("registered_count", 0),
+            "waitlist_count": event["waitlist_count"],
+        }
+        for event in events
+    ]
+
+
+
 @router.get("/registrations", response_model=list[RegistrationOut])
 async def view_event_registration(event_id: PydanticObjectId):
     event_id_str = str(event_id)
@@ -1,29 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from app.models.member_model import Member
 from app.schemas.member_schema import MemberCreate, MemberUpdate, MemberOut
+from app.utils.auth import (get_password_hash_async,
+                            bump_token_version,
+                            record_token_version,
+                            revoke_member_tokens)
+from app.utils.projection import fields_query, parse_fields, projection_model, mongo_projection
+from app.utils.serialization import documents_json, json_response, model_response
+from app.database.connection import get_collection
 from beanie import PydanticObjectId
+from typing import Optional
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[MemberOut])
-async def get_all_members():
-    members = await Member.find_all().to_list()
-
-    return [
-        MemberOut(
-            id=str(member.id),
-            first_name=member.first_name,
-            last_name=member.last_name,
-            email=member.email,
-            phone=member.phone,
-            role=member.role,
-            join_date=member.join_date,
-            is_active=member.is_active,
-            departments=member.departments or []
-        )
-        for member in members
-    ]
+async def get_all_members(fields: Optional[str] = fields_query()):
+    # MemberOut has no password_hash, so the default projection never loads it
+    fields = parse_fields(fields, MemberOut)
+    members = await get_collection(Member).find({}, mongo_projection(fields)).to_list(None)
+    return json_response(documents_json(projection_model(Member, fields), members))
 
 
 @router.post("/", response_model=MemberOut)
@@ -31,9 +27,13 @@ async def create_member(member_data: MemberCreate):
     if await Member.find_one(Member.email == member_data.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    new_member = Member(**member_data.dict())
+    member_dict = member_data.dict(exclude={"password"})
+    new_member = Member(
+        **member_dict,
+        password_hash=await get_password_hash_async(member_data.password)
+    )
     await new_member.insert()
-    return new_member
+    return model_response(MemberOut, MemberOut.from_member(new_member))
 
 
 @router.put("/{member_id}", response_model=MemberOut)
@@ -43,8 +43,12 @@ async def update_member(member_id: PydanticObjectId, update_data:MemberUpdate):
         raise HTTPException(status_code=404, detail="Member not found")
     
     update_data = update_data.dict(exclude_unset=True)
+    if any(field in update_data for field in ("role", "is_active", "department")):
+        # Role, status and department changes must not ride on old token claims
+        update_data["token_version"] = bump_token_version(member)
     await member.set(update_data)
-    return member
+    record_token_version(member)
+    return model_response(MemberOut, MemberOut.from_member(member))
 
 
 @router.delete("/{member_id}")
@@ -53,16 +57,20 @@ async def delete_member(member_id: PydanticObjectId):
     if not member:
         raise HTTPException(status_code=404, detail="Memebr not found")
     
+    bump_token_version(member)
+    await revoke_member_tokens(member)
     await member.delete()
+    record_token_version(member)
     return {"message": "Member deleted"}
 
 
-@router.get("/search")
-async def search_members(role: str = Query(None)):
+@router.get("/search", response_model=list[MemberOut])
+async def search_members(role: str = Query(None), fields: Optional[str] = fields_query()):
     if not role:
         raise HTTPException(status_code=400, detail="Role parameter required")
-    members = await Member.find(Member.role == role).to_list()
-    return members
+    fields = parse_fields(fields, MemberOut)
+    members = await get_collection(Member).find({"role": role}, mongo_projection(fields)).to_list(None)
+    return json_response(documents_json(projection_model(Member, fields), members))
 
 
 
@@ -1,5 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from app.models.member_model import Member, VALID_ROLES
+from app.utils.auth import (principal_cache,
+                            bump_token_version,
+                            record_token_version)
 from beanie import PydanticObjectId
 from pydantic import BaseModel
 
@@ -21,5 +24,13 @@ async def promote_user(user_id: PydanticObjectId, request: PromoteUserRequest):
         raise HTTPException(status_code=404, detail="User not found")
     
     user.role = request.new_role
+    bump_token_version(user)
     await user.save()
-    return {"message": f"User promoted to {request.new_role}"}
\ No newline at end of file
+    record_token_version(user)
+    return {"message": f"User promoted to {request.new_role}"}
+
+
+@router.get("/principal-cache/stats")
+async def principal_cache_stats():
+    """Hit rate and database lookups avoided by the authenticated-user cache"""
+    return principal_cache.stats()
@@ -4,20 +4,20 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.models.announcement_model import Announcement
-from app.models.member_model import Member
+from app.schemas.auth_schema import Principal
 from app.schemas.announcement_schema import AnnouncementResponse
-from app.dependencies import get_current_user
+from app.dependencies import get_current_principal
+from app.utils.cache import cached
+from app.database.connection import get_read_collection
+from app.utils.projection import fields_query, parse_fields, projection_model, mongo_projection
+from app.utils.serialization import documents_json, json_response
 
 router = APIRouter()
 
-@router.get("", response_model=List[AnnouncementResponse])
-async def get_announcements(
-    current_user: Member = Depends(get_current_user),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
-    priority: Optional[str] = Query(None)
-):
-    """Get published announcements relevant to the current user"""
+@cached(ttl=60, tags=("announcements",))
+async def load_announcements(is_staff: bool, departments: tuple, skip: int,
+                             limit: int, priority: Optional[str], fields: tuple) -> bytes:
+    """Published announcements for one audience, shared by every user in it"""
     # Base query for published, non-expired announcements
     query = {
         "is_published": True,
@@ -31,39 +31,46 @@ async def get_announcements(
     if priority:
         query["priority"] = priority
     
-    # Check if user is staff (admin, pastor, elder)
-    is_staff = current_user.role in ["Admin", "Staff"]
-    
     # Filter by target audience
     target_query = {
         "$or": [
             {"target": "all"},
             {"target": "members"},
             {"target": "staff", "$expr": {"$eq": [is_staff, True]}},
-            {"target": "departments", "target_departments": {"$in": current_user.departments}}
+            {"target": "departments", "target_departments": {"$in": list(departments)}}
         ]
     }
     
     # Combine queries
     final_query = {"$and": [query, target_query]}
     
-    announcements = await Announcement.find(
-        final_query
-    ).sort("-created_at").skip(skip).limit(limit).to_list()
-    
-    # Convert to response models with string IDs
-    return [
-        AnnouncementResponse(
-            **announcement.dict(exclude={"id"}),
-            id=str(announcement.id)
-        )
-        for announcement in announcements
-    ]
+    docs = await get_read_collection(Announcement).find(
+        final_query, mongo_projection(fields)
+    ).sort("created_at", -1).skip(skip).limit(limit).to_list(None)
+    return documents_json(projection_model(Announcement, fields), docs)
+
+
+@router.get("", response_model=List[AnnouncementResponse])
+async def get_announcements(
+    current_user: Principal = Depends(get_current_principal),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    priority: Optional[str] = Query(None),
+    fields: Optional[str] = fields_query()
+):
+    """Get published announcements relevant to the current user"""
+    # Check if user is staff (admin, pastor, elder)
+    is_staff = current_user.role in ["Admin", "Staff"]
+    departments = tuple(sorted(current_user.departments))
+    fields = parse_fields(fields, AnnouncementResponse)
+    return json_response(
+        await load_announcements(is_staff, departments, skip, limit, priority, fields)
+    )
 
 @router.get("/{id}", response_model=AnnouncementResponse)
 async def get_announcement(
     id: str,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """Get a specific announcement"""
     try:
@@ -1,32 +1,65 @@
 from app.models.attendance_model import AttendanceCheckIn
-from app.schemas.attendance_schema import CheckInCreate, CheckInOut
-from app.utils.auth import get_current_user
+from app.schemas.attendance_schema import CheckInCreate, CheckInOut, CheckInBatchResult
+from app.utils.auth import get_current_principal, get_active_principal
+from app.utils.checkin import checkin_buffer, decode_ndjson, read_upload, write_checkin_batch
+from app.dependencies import require_admin
+from app.utils.serialization import model_response
+from bson import ObjectId
 from app.models.member_model import Member
-from fastapi import APIRouter, Depends, HTTPException
+from app.schemas.auth_schema import Principal
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.models.settings_model import AttendanceSettings
+from app.utils.settings_registry import settings_registry
 
 
 router = APIRouter(tags=["Attendance"])
 
 
 @router.get("/form-url", response_model=dict)
-async def get_attendance_form_url(current_user: Member = Depends(get_current_user)):
-    settings = await AttendanceSettings.find_one()
-    if not settings or not settings.google_form_url:
+async def get_attendance_form_url(current_user: Principal = Depends(get_current_principal)):
+    url = settings_registry.get(AttendanceSettings).google_form_url
+    if not url:
         raise HTTPException(
             status_code=404,
             detail = "No attendance form configured"
         )
-    return {"url": settings.google_form_url}
+    return {"url": url}
 
 
-"""@router.post("/check-in", response_model=CheckInOut)
+@router.post("/check-in", response_model=CheckInOut, status_code=202)
 async def check_in_to_service(
     check_in_data: CheckInCreate,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_active_principal)
 ):
-    new_checkin = AttendanceCheckIn(
-        member_id=str(current_user.id), **check_in_data.dict())
-    await new_checkin.insert()
-    return new_checkin
-"""
\ No newline at end of file
+    """Record attendance; the write is buffered and flushed in batches"""
+    if not ObjectId.is_valid(check_in_data.event_id):
+        raise HTTPException(status_code=400, detail="Invalid event id")
+    record, _ = checkin_buffer.add(
+        str(current_user.id),
+        check_in_data.event_id,
+        check_in_data.role,
+        check_in_data.age_group,
+    )
+    return model_response(CheckInOut, CheckInOut.model_construct(
+        id=str(record["_id"]),
+        member_id=record["member_id"],
+        event_id=record["event_id"],
+        role=record["role"],
+        age_group=record["age_group"],
+        check_in_time=record["check_in_time"],
+    ), status_code=202)
+
+
+@router.post("/check-in/batch", response_model=CheckInBatchResult)
+async def sync_kiosk_check_ins(
+    request: Request,
+    current_user: Principal = Depends(require_admin)
+):
+    """Upload a kiosk's offline check-ins as NDJSON, optionally gzipped.
+
+    Each line is a KioskCheckIn. Safe to retry: rows already stored come
+    back as duplicates.
+    """
+    body = await read_upload(request)
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    return await write_checkin_batch(decode_ndjson(body, gzipped))
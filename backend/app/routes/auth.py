@@ -1,16 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from app.models.member_model import Member
-from app.schemas.auth_schema import TokenResponse, UserRegister, PasswordUpdate
-from app.utils.auth import (create_access_token,  
-                            verify_password,
-                            get_password_hash,
-                            get_current_active_user
+from app.schemas.auth_schema import (TokenResponse,
+                                     UserRegister,
+                                     PasswordUpdate,
+                                     RefreshRequest,
+                                     RefreshTokenResponse)
+from app.utils.auth import (issue_tokens,
+                            rotate_refresh_token,
+                            revoke_token_family,
+                            decode_access_token,
+                            oauth2_scheme,
+                            verify_password_async,
+                            get_password_hash_async,
+                            get_current_active_user,
+                            bump_token_version,
+                            record_token_version,
+                            update_member_fields
                         )
 from app.schemas.member_schema import MemberOut, MemberCreate, MemberSelfUpdate
 from app.schemas.auth_schema import TokenResponse, PasswordUpdate
+from app.utils.revocation import revocation_list
+from app.utils.serialization import model_response
+from jose import JWTError
+from datetime import datetime
 import logging
-from bson import ObjectId
 
 
 logger = logging.getLogger(__name__)
@@ -23,7 +37,7 @@ async def register(user_data: MemberCreate):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, 
                             detail="Email already registered")
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_member = Member(
         first_name=user_data.first_name,
         last_name=user_data.last_name,
@@ -33,73 +47,37 @@ async def register(user_data: MemberCreate):
         role = user_data.role
     )
     await new_member.insert()
-    access_token = create_access_token(data={"sub": str(new_member.id)})
-
-
-    member_out = MemberOut(
-        id=str(new_member.id),
-        first_name=new_member.first_name,
-        last_name=new_member.last_name,
-        email=new_member.email,
-        phone=new_member.phone,
-        role=new_member.role,
-        join_date=new_member.join_date,
-        is_active=new_member.is_active,
-        departments=new_member.departments
+    tokens = await issue_tokens(new_member)
+
+
+    return model_response(
+        TokenResponse,
+        TokenResponse.model_construct(**tokens, user=MemberOut.from_member(new_member))
     )
-    
-    return {
-        "access_token": access_token, 
-        "token_type": "bearer",
-        "user": member_out
-    }
 
 
 @router.post("/login", response_model=TokenResponse)
 async def login(form_data: OAuth2PasswordRequestForm=Depends()):
     
     user = await Member.find_one(Member.email == form_data.username)
-    if not user or not user.verify_password(form_data.password):
+    if not user or not await user.verify_password_async(form_data.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, 
                             detail="Invalid credentials",
                             headers={"WWW-Authenticate": "Bearer"}
                             )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
-    member_out = MemberOut(
-        id=str(user.id),
-        first_name=user.first_name,
-        last_name=user.last_name,
-        email=user.email,
-        phone=user.phone,
-        role=user.role,
-        join_date=user.join_date,
-        is_active=user.is_active,
-        departments=user.departments
+    tokens = await issue_tokens(user)
+    return model_response(
+        TokenResponse,
+        TokenResponse.model_construct(**tokens, user=MemberOut.from_member(user))
     )
-    
-    return {
-        "access_token": access_token, 
-        "token_type": "bearer",
-        "user": member_out
-    }
 
 
 
 @router.get("/me", response_model=MemberOut)
 async def get_current_user_endpoint(current_user: Member = Depends(get_current_active_user)):
     
-    return MemberOut(
-        id=str(current_user.id),
-        first_name=current_user.first_name,
-        last_name=current_user.last_name,
-        email=current_user.email,
-        phone=current_user.phone,
-        role=current_user.role,
-        join_date=current_user.join_date,
-        is_active=current_user.is_active,
-        departments=current_user.departments
-    )
+    return model_response(MemberOut, MemberOut.from_member(current_user))
 
 
 
@@ -109,16 +87,18 @@ async def update_password(password_data: PasswordUpdate,
                            ):
     
     
-    user = await Member.get(ObjectId(current_user["id"]))
+    user = await Member.get(current_user.id)
     
-    if not verify_password(password_data.current_password, user.password_hash):
+    if not await verify_password_async(password_data.current_password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Current password is incorrect"
                             )
     
-    new_hashed_password = get_password_hash(password_data.new_password)
+    new_hashed_password = await get_password_hash_async(password_data.new_password)
     user.password_hash = new_hashed_password
+    bump_token_version(user)
     await user.save()
+    record_token_version(user)
     return {"messsage": "Password updated successfully"}
     
 
@@ -128,28 +108,30 @@ async def update_current_user(
     update_data: MemberSelfUpdate,
     current_user: Member = Depends(get_current_active_user)
 ):
-    # Apply updates
+    # Only the submitted fields are written; current_user may be a cached copy
     update_dict = update_data.dict(exclude_unset=True)
-    for field, value in update_dict.items():
-        setattr(current_user, field, value)
-    
-    # Save changes
-    await current_user.save()
-
-    return MemberOut(
-        id=str(current_user.id),
-        first_name=current_user.first_name,
-        last_name=current_user.last_name,
-        email=current_user.email,
-        phone=current_user.phone,
-        role=current_user.role,
-        join_date=current_user.join_date,
-        is_active=current_user.is_active,
-        departments=current_user.departments
-    )
+    member = await update_member_fields(current_user, update_dict)
+
+    return model_response(MemberOut, MemberOut.from_member(member))
 
  
     
+@router.post("/refresh", response_model=RefreshTokenResponse)
+async def refresh_tokens(refresh_data: RefreshRequest):
+    return await rotate_refresh_token(refresh_data.refresh_token)
+
+
 @router.post("/logout")
-async def logout():
+async def logout(token: str = Depends(oauth2_scheme)):
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        # Already expired or revoked: nothing left to log out
+        return {"message": "Logout successful"}
+
+    expires_at = datetime.utcfromtimestamp(payload["exp"])
+    if payload.get("jti"):
+        await revocation_list.revoke(payload["jti"], expires_at)
+    if payload.get("fam"):
+        await revoke_token_family(payload["fam"])
     return {"message": "Logout successful"}
\ No newline at end of file
@@ -1,9 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from beanie import PydanticObjectId
 from app.models.event_model import Event, EventRegistration, VolunteerSignup
 from app.schemas.event_schema import EventOut, RegistrationCreate, VolunteerSignupCreate
 from app.models.member_model import Member
 from app.dependencies import get_current_user
+from app.utils.cache import cached
+from app.database.monitoring import query_budget
+from app.database.connection import get_collection
+from app.utils.registrations import (reserve_seat,
+                                     release_seat,
+                                     join_waitlist,
+                                     leave_waitlist,
+                                     waitlist_promoter)
+from pymongo.errors import DuplicateKeyError
+from app.utils.event_window import upcoming_events
+from app.utils.projection import fields_query, parse_fields, projection_model, mongo_projection
+from app.utils.serialization import documents_json, json_response
+from typing import Optional
 import logging
 import datetime
 
@@ -13,83 +26,113 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Events"])
 
 @router.get("/", response_model=list[EventOut])
-async def list_upcoming_events():
+async def list_upcoming_events(
+    start: Optional[datetime.datetime] = Query(None, alias="from",
+                                               description="Defaults to now"),
+    end: Optional[datetime.datetime] = Query(None, alias="to",
+                                             description="Defaults to the end of the cached window"),
+    event_type: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = fields_query()
+):
+    """Upcoming published events in start time order, one keyset page at a time"""
+    fields = parse_fields(fields, EventOut)
     try:
-        events = await Event.find(Event.is_published == True).sort(Event.start_time).to_list()
-        return [
-            EventOut(
-                id=str(event.id),
-                title=event.title,
-                description=event.description,
-                start_time=event.start_time,
-                end_time=event.end_time,
-                location=event.location,
-                event_type=event.event_type,
-                is_published=event.is_published,
-                registration_required=event.registration_required,
-                max_attendees=event.max_attendees,
-                volunteers_needed=event.volunteers_needed,
-                volunteer_roles=event.volunteer_roles
-            )
-            for event in events
-        ]
+        events, next_cursor = await upcoming_events(
+            start, end, event_type, cursor, limit, mongo_projection(fields)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing events: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve events"
         )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return json_response(documents_json(projection_model(Event, fields), events), headers=headers)
     
 
-@router.get("/{event_id}", response_model=EventOut)
-async def get_event_details(event_id: PydanticObjectId):
-    event = await Event.get(event_id)
+@cached(ttl=120, tags=lambda event_id: ("events", f"event:{event_id}"))
+async def load_published_event(event_id: str):
+    event = await Event.get(PydanticObjectId(event_id))
     if not event or not event.is_published:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
+        return None
     event_data = event.dict()
     event_data["id"] = str(event.id)
     return event_data
 
 
+@router.get("/{event_id}", response_model=EventOut)
+async def get_event_details(event_id: PydanticObjectId):
+    event_data = await load_published_event(str(event_id))
+    if event_data is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event_data
+
+
 
 @router.post("/{event_id}/register")
-async def rsvp_to_event(event_id: PydanticObjectId, current_user: Member = Depends(get_current_user)):
-    event = await Event.get(event_id)
-    if not event or not event.is_published:
-        raise HTTPException(status_code=404, detail="Event not found")
-    
-    if not event.registration_required:
-        raise HTTPException(status_code=400, detail="Registration not required for this event")
-    
-    # Check if already registered
-    existing_reg = await EventRegistration.find_one(
-        EventRegistration.event_id == str(event_id),
-        EventRegistration.member_id == str(current_user.id),
-        EventRegistration.role == current_user.role,
-    )
-    if existing_reg:
-        raise HTTPException(status_code=400, detail="Already registered for this event")
-    
-    # Check capacity
-    if event.max_attendees:
-        current_registrations = await EventRegistration.find(
-            EventRegistration.event_id == str(event_id)
-        ).count()
-        if current_registrations >= event.max_attendees:
-            raise HTTPException(status_code=400, detail="Event is full")
-    
-    # Create registration
+# Registering takes 2 commands; joining the waitlist of a full event takes 5
+@query_budget(5)
+async def rsvp_to_event(event_id: PydanticObjectId, response: Response,
+                        current_user: Member = Depends(get_current_user)):
+    member_name = f"{current_user.first_name} {current_user.last_name}"
+    # Reserve first so concurrent requests can never oversell; the unique
+    # (event_id, member_id) index rejects duplicates at insert
+    if not await reserve_seat(event_id):
+        event = await Event.get(event_id)
+        if not event or not event.is_published:
+            raise HTTPException(status_code=404, detail="Event not found")
+        if not event.registration_required:
+            raise HTTPException(status_code=400, detail="Registration not required for this event")
+        if await EventRegistration.find_one(
+            EventRegistration.event_id == str(event_id),
+            EventRegistration.member_id == str(current_user.id),
+        ):
+            raise HTTPException(status_code=400, detail="Already registered for this event")
+        try:
+            position = await join_waitlist(event_id, str(current_user.id), member_name, current_user.role)
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Already on the waitlist for this event")
+        response.status_code = 202
+        return {"message": "Event is full, added to the waitlist", "position": position}
+
     new_reg = EventRegistration(
         event_id=str(event_id),
         member_id=str(current_user.id),
-        member_name = f"{current_user.first_name} {current_user.last_name}",
+        member_name = member_name,
         role = current_user.role,
     )
-    await new_reg.insert()
+    try:
+        await new_reg.insert()
+    except DuplicateKeyError:
+        await release_seat(event_id)
+        waitlist_promoter.notify(event_id)
+        raise HTTPException(status_code=400, detail="Already registered for this event")
+    except Exception:
+        await release_seat(event_id)
+        waitlist_promoter.notify(event_id)
+        raise
     return {"message": "Successfully registered for event"}
 
 
+@router.delete("/{event_id}/register")
+async def cancel_registration(event_id: PydanticObjectId, current_user: Member = Depends(get_current_user)):
+    registration = await get_collection(EventRegistration).find_one_and_delete(
+        {"event_id": str(event_id), "member_id": str(current_user.id)}
+    )
+    if registration:
+        await release_seat(event_id)
+        waitlist_promoter.notify(event_id)
+        return {"message": "Registration cancelled"}
+
+    if await leave_waitlist(event_id, str(current_user.id)):
+        return {"message": "Removed from the waitlist"}
+    raise HTTPException(status_code=404, detail="Not registered for this event")
+
+
 
 @router.post("/{event_id}/volunteer")
 async def signup_to_volunteer(event_id: PydanticObjectId, role: str, current_user: Member = Depends(get_current_user)):
@@ -2,39 +2,26 @@ from fastapi import APIRouter, Depends, HTTPException
 from app.models.member_model import Member
 from app.schemas.member_schema import MemberOut, MemberSelfUpdate
 from app.dependencies import get_current_user, get_current_active_user
+from app.utils.auth import update_member_fields
+from app.utils.serialization import model_response
 import logging
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Member Profile"])
 
-def convert_member_to_out(member: Member) -> dict:
-    return {
-        "id": str(member.id),
-        "first_name": member.first_name,
-        "last_name": member.last_name,
-        "email": member.email,
-        "phone": member.phone,
-        "role": member.role,
-        "join_date": member.join_date,
-        "is_active": member.is_active,
-        "departments": member.departments
-    }
-
-
 @router.get("/me", response_model=MemberOut)
 async def update_my_profile(
     update_data: MemberSelfUpdate,
     current_user: Member = Depends(get_current_user)):
     try:
         update_dict = update_data.dict(exclude_unset=True)
-        for field, value in update_dict.items():
-            setattr(current_user, field, value)
+        member = await update_member_fields(current_user, update_dict)
 
-        await current_user.save()
+        return model_response(MemberOut, MemberOut.from_member(member))
 
-        return convert_member_to_out(current_user)
-    
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating user: {str(e)}")
         raise HTTPException(
@@ -49,7 +36,7 @@ async def get_my_profile(
 ):
     
     try:
-        return convert_member_to_out(current_user)
+        return model_response(MemberOut, MemberOut.from_member(current_user))
     except Exception as e:
         logger.error(f"Error fetching current user: {str(e)}")
         raise HTTPException(
@@ -6,10 +6,14 @@ from app.schemas.prayer_testimony_schema import (PrayerRequestCreate,
                                                  CommentBase,
                                                  TestimonyOut,
                                                  TestimonyCreate)
-from app.models.member_model import Member
-from app.utils.auth import get_current_user
+from app.schemas.auth_schema import Principal
+from app.utils.auth import get_current_principal
+from app.utils.cache import cached
+from app.database.connection import get_read_collection
+from app.utils.projection import fields_query, parse_fields, projection_model, mongo_projection
+from app.utils.serialization import documents_json, json_response
 from beanie import PydanticObjectId
-from typing import List
+from typing import List, Optional
 import logging
 
 
@@ -20,7 +24,7 @@ router = APIRouter(tags=["Prayer & Testimony"])
 @router.post("/prayer-requests", response_model=PrayerRequestOut)
 async def submit_prayer_request(
     request_data: PrayerRequestCreate,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     new_request = PrayerRequest(
         member_id=str(current_user.id),
@@ -32,13 +36,18 @@ async def submit_prayer_request(
 
 
 
+@cached(ttl=60, tags=("prayer_requests",))
+async def load_public_prayer_requests(fields: tuple) -> bytes:
+    requests = await get_read_collection(PrayerRequest).find(
+        {"is_public": True, "is_approved": True}, mongo_projection(fields)
+    ).to_list(None)
+    return documents_json(projection_model(PrayerRequest, fields), requests)
+
+
 @router.get("/prayer-requests", response_model=List[PrayerRequestOut])
-async def get_public_prayer_requests():
-    requests = await PrayerRequest.find(
-        PrayerRequest.is_public == True,
-        PrayerRequest.is_approved == True
-    ).to_list()
-    return requests
+async def get_public_prayer_requests(fields: Optional[str] = fields_query()):
+    fields = parse_fields(fields, PrayerRequestOut)
+    return json_response(await load_public_prayer_requests(fields))
 
 
 
@@ -46,7 +55,7 @@ async def get_public_prayer_requests():
 async def increment_prayer_count(
     request_id: PydanticObjectId,
     update: PrayerCounterUpdate,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     request = await PrayerRequest.get(request_id)
     if not request:
@@ -62,7 +71,7 @@ async def increment_prayer_count(
 async def add_prayer_comment(
     request_id: PydanticObjectId,
     comment_data: CommentBase,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     request = await PrayerRequest.get(request_id)
     if not request:
@@ -81,7 +90,7 @@ async def add_prayer_comment(
 @router.post("/testimonies", response_model=TestimonyOut)
 async def submit_testimony(
     testimony_data: TestimonyCreate,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     new_testimony = Testimony(
         member_id=str(current_user.id),
@@ -93,19 +102,25 @@ async def submit_testimony(
 
 
 
+@cached(ttl=60, tags=("testimonies",))
+async def load_public_testimonies(fields: tuple) -> bytes:
+    testimonies = await get_read_collection(Testimony).find(
+        {"is_approved": True}, mongo_projection(fields)
+    ).to_list(None)
+    return documents_json(projection_model(Testimony, fields), testimonies)
+
+
 @router.get("/testimonies", response_model=List[TestimonyOut])
-async def get_public_testimonies():
-    testimonies = await Testimony.find(
-        Testimony.is_approved == True
-    ).to_list()
-    return testimonies
+async def get_public_testimonies(fields: Optional[str] = fields_query()):
+    fields = parse_fields(fields, TestimonyOut)
+    return json_response(await load_public_testimonies(fields))
 
 
 @router.post("testimonies/{testimony_id}/comments")
 async def add_testimony_comment(
     testimony_id: PydanticObjectId,
     comment_data: CommentBase,
-    current_user: Member = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     testimony = await Testimony.get(testimony_id)
     if not testimony:
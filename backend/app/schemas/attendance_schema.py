@@ -1,6 +1,6 @@
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
-from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, field_validator
+from datetime import datetime, timezone
 
 
 class CheckInCreate(BaseModel):
@@ -17,8 +17,55 @@ class CheckInOut(CheckInCreate):
     model_config = ConfigDict(from_attributes=True)
 
 
+class KioskCheckIn(CheckInCreate):
+    """One line of a kiosk's offline NDJSON upload"""
+    member_id: str
+    check_in_time: Optional[datetime] = None
+
+    @field_validator("check_in_time")
+    @classmethod
+    def to_naive_utc(cls, v):
+        if v is not None and v.tzinfo is not None:
+            return v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+
+class CheckInBatchResult(BaseModel):
+    received: int
+    inserted: int
+    duplicates: int
+    # One character per row, in upload order: i inserted, d duplicate, e error
+    status: str
+    # Row index -> reason, for rows marked e
+    errors: Dict[int, str] = {}
+
+
 class AttendanceReportRequest(BaseModel):
     start_date: datetime
     end_date: datetime
     role: Optional[str] = None
     age_group: Optional[str] = None
+    interval: Literal["day", "week", "month", "year"] = "day"
+
+
+class AttendancePeriod(BaseModel):
+    period: datetime
+    count: int
+
+
+class AttendanceReport(BaseModel):
+    start_date: datetime
+    end_date: datetime
+    interval: str
+    total: int
+    series: List[AttendancePeriod]
+    by_role: Dict[str, int]
+    by_age_group: Dict[str, int]
+    by_event: Dict[str, int]
+
+
+class CohortOut(BaseModel):
+    count: int
+    # Services (event ids) the cohort was computed over, oldest first
+    services: List[str]
+    member_ids: List[str]
@@ -1,13 +1,27 @@
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr
 from app.schemas.member_schema import MemberOut
 
 
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
     user: MemberOut
 
 
+class RefreshTokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -20,4 +34,23 @@ class UserRegister(UserLogin):
 
 class PasswordUpdate(BaseModel):
     current_password: str
-    new_password: str
\ No newline at end of file
+    new_password: str
+
+
+class Principal(BaseModel):
+    """Identity and authorization facts carried by an access token"""
+    id: str
+    role: str
+    is_active: bool = True
+    departments: List[str] = []
+    token_version: int = 0
+
+    @classmethod
+    def from_member(cls, member) -> "Principal":
+        return cls(
+            id=str(member.id),
+            role=member.role,
+            is_active=member.is_active,
+            departments=member.departments or [],
+            token_version=member.token_version,
+        )
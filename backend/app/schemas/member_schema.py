@@ -37,7 +37,7 @@ class MemberOut(BaseModel):
     first_name: str
     last_name: str
     email: str
-    phone: str
+    phone: Optional[str] = None
     role: str
     join_date: datetime
     is_active: bool
@@ -48,3 +48,18 @@ class MemberOut(BaseModel):
         from_attributes=True
     )
 
+    @classmethod
+    def from_member(cls, member) -> "MemberOut":
+        """Build from a loaded Member without re-validating its fields"""
+        return cls.model_construct(
+            id=str(member.id),
+            first_name=member.first_name,
+            last_name=member.last_name,
+            email=member.email,
+            phone=member.phone,
+            role=member.role,
+            join_date=member.join_date,
+            is_active=member.is_active,
+            departments=member.departments or [],
+        )
+
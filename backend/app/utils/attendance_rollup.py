@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.database.connection import get_collection
+from app.models.attendance_model import AttendanceCheckIn, AttendanceDaily, AttendanceRollupRebuild
+from app.utils.event_window import utc_naive
+
+logger = logging.getLogger(__name__)
+
+UNSPECIFIED = "unspecified"
+REBUILD_ID = "attendance_daily"
+# Longest a check-in write may take from stamping written_at to its rollup increment
+ROLLUP_REBUILD_GRACE_SECONDS = float(os.getenv("ROLLUP_REBUILD_GRACE_SECONDS", "5"))
+# A lease left behind by a rebuild that died is ignored after this long
+ROLLUP_REBUILD_TIMEOUT_SECONDS = int(os.getenv("ROLLUP_REBUILD_TIMEOUT_SECONDS", "3600"))
+
+RollupKey = Tuple[datetime, str, str, Optional[str]]
+
+
+def day_of(value: datetime) -> datetime:
+    """Midnight UTC of the day a (naive UTC) check-in time falls on"""
+    return utc_naive(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _left_to_rebuild(rebuild: Optional[dict], record: dict) -> bool:
+    """Whether a running or just finished rebuild counts this check-in itself"""
+    written_at = record.get("written_at")
+    if rebuild is None or written_at is None:
+        return False
+    if rebuild["running"]:
+        if rebuild["expires_at"] < datetime.utcnow():
+            return False
+        # No cutoff yet: hold everything back, the rebuild's own count covers it
+        after, before = rebuild.get("cutoff"), None
+    else:
+        after, before = rebuild.get("cutoff"), rebuild.get("until")
+        if after is None or before is None:
+            return False
+    if (after is not None and written_at < after) or (before is not None and written_at >= before):
+        return False
+    day = day_of(record["check_in_time"])
+    return ((rebuild.get("start") is None or day >= rebuild["start"])
+            and (rebuild.get("end") is None or day < rebuild["end"]))
+
+
+async def _increment(counts: Dict[RollupKey, int]):
+    await get_collection(AttendanceDaily).bulk_write([
+        UpdateOne(
+            {"day": day, "event_id": event_id, "role": role, "age_group": age_group},
+            {"$inc": {"checkins": count}},
+            upsert=True,
+        )
+        for (day, event_id, role, age_group), count in counts.items()
+    ], ordered=False)
+
+
+async def record_checkins(records: Iterable[dict]) -> int:
+    """Add newly stored check-ins to the daily rollups with one bulk upsert.
+
+    Called only with rows that were actually inserted, so duplicates never
+    count twice. Check-ins that a concurrent rebuild will count are skipped.
+    A failure here leaves the raw records intact; the admin rebuild endpoint
+    recomputes the affected days.
+    """
+    records = list(records)
+    if not records:
+        return 0
+    try:
+        rebuild = await get_collection(AttendanceRollupRebuild).find_one({"_id": REBUILD_ID})
+        counts = Counter(
+            (day_of(record["check_in_time"]), record["event_id"], record["role"], record.get("age_group"))
+            for record in records
+            if not _left_to_rebuild(rebuild, record)
+        )
+        if counts:
+            await _increment(counts)
+    except Exception:
+        logger.exception(f"Failed to update attendance rollups for {len(records)} check-ins")
+        return 0
+    return len(counts)
+
+
+async def _count_checkins(match: dict) -> List[dict]:
+    return await get_collection(AttendanceCheckIn).aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "day": {"$dateTrunc": {"date": "$check_in_time", "unit": "day"}},
+                "event_id": "$event_id",
+                "role": "$role",
+                "age_group": {"$ifNull": ["$age_group", None]},
+            },
+            "count": {"$sum": 1},
+        }},
+    ], allowDiskUse=True).to_list(None)
+
+
+async def rebuild_rollups(start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+    """Recompute rollups from attendance_records for whole days in [start, end].
+
+    Check-ins keep being recorded meanwhile. The rebuild takes a lease, fixes
+    a cutoff, and replaces the rollups with the check-ins written before it;
+    ``record_checkins`` leaves those written after the cutoff to the rebuild,
+    which adds them once it has released the lease. This relies on worker
+    clocks agreeing to well within ``ROLLUP_REBUILD_GRACE_SECONDS``.
+    """
+    day_range = {}
+    if start is not None:
+        day_range["$gte"] = day_of(start)
+    if end is not None:
+        day_range["$lt"] = day_of(end) + timedelta(days=1)
+    match = {"check_in_time": day_range} if day_range else {}
+
+    rebuilds = get_collection(AttendanceRollupRebuild)
+    now = datetime.utcnow()
+    try:
+        await rebuilds.update_one(
+            {"_id": REBUILD_ID, "$or": [{"running": False}, {"expires_at": {"$lt": now}}]},
+            {"$set": {
+                "running": True,
+                "start": day_range.get("$gte"),
+                "end": day_range.get("$lt"),
+                "cutoff": None,
+                "until": None,
+                "expires_at": now + timedelta(seconds=ROLLUP_REBUILD_TIMEOUT_SECONDS),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Attendance rollups are already being rebuilt")
+
+    rollups = get_collection(AttendanceDaily)
+    cutoff = None
+    try:
+        # Taken once the lease is visible, so every check-in written from here on is held back
+        cutoff = datetime.utcnow()
+        await rebuilds.update_one({"_id": REBUILD_ID}, {"$set": {"cutoff": cutoff}})
+        # Increments already under way land before the rollups are replaced
+        await asyncio.sleep(ROLLUP_REBUILD_GRACE_SECONDS)
+        rows = await _count_checkins({**match, "written_at": {"$not": {"$gte": cutoff}}})
+        await rollups.delete_many({"day": day_range} if day_range else {})
+        if rows:
+            await rollups.bulk_write([
+                ReplaceOne(row["_id"], {**row["_id"], "checkins": row["count"]}, upsert=True)
+                for row in rows
+            ], ordered=False)
+    finally:
+        until = datetime.utcnow()
+        await rebuilds.update_one(
+            {"_id": REBUILD_ID},
+            {"$set": {"running": False, "cutoff": cutoff or until, "until": until}},
+        )
+
+    # Add the check-ins that were held back while the rebuild ran
+    await asyncio.sleep(ROLLUP_REBUILD_GRACE_SECONDS)
+    late = await _count_checkins({**match, "written_at": {"$gte": cutoff, "$lt": until}})
+    if late:
+        await _increment({
+            (row["_id"]["day"], row["_id"]["event_id"], row["_id"]["role"], row["_id"]["age_group"]): row["count"]
+            for row in late
+        })
+    logger.info(f"Rebuilt {len(rows)} attendance rollups, then added {sum(row['count'] for row in late)} "
+                f"check-ins written during the rebuild")
+    return len(rows)
+
+
+async def attendance_report(start: datetime, end: datetime, role: Optional[str],
+                            age_group: Optional[str], interval: str) -> dict:
+    """Totals for [start, end] by period, role, age group and event, from the rollups"""
+    match = {"day": {"$gte": day_of(start), "$lte": day_of(end)}}
+    if role:
+        match["role"] = role
+    if age_group:
+        match["age_group"] = age_group
+    period = "$day" if interval == "day" else {"$dateTrunc": {"date": "$day", "unit": interval}}
+
+    def total_by(key):
+        return [{"$group": {"_id": key, "count": {"$sum": "$checkins"}}}, {"$sort": {"_id": 1}}]
+
+    facets = (await get_collection(AttendanceDaily).aggregate([
+        {"$match": match},
+        {"$facet": {
+            "series": total_by(period),
+            "by_role": total_by("$role"),
+            "by_age_group": total_by("$age_group"),
+            "by_event": total_by("$event_id"),
+        }},
+    ]).to_list(None))[0]
+
+    def as_dict(rows):
+        return {row["_id"] if row["_id"] is not None else UNSPECIFIED: row["count"] for row in rows}
+
+    return {
+        "start_date": day_of(start),
+        "end_date": day_of(end),
+        "interval": interval,
+        "total": sum(row["count"] for row in facets["series"]),
+        "series": [{"period": row["_id"], "count": row["count"]} for row in facets["series"]],
+        "by_role": as_dict(facets["by_role"]),
+        "by_age_group": as_dict(facets["by_age_group"]),
+        "by_event": as_dict(facets["by_event"]),
+    }
@@ -1,11 +1,21 @@
+import asyncio
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import Optional, Tuple
 from jose import jwt, JWTError
+from beanie import UpdateResponse
 from bson import ObjectId
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from app.database.connection import get_collection
 from app.models.member_model import Member
+from app.models.token_model import RefreshToken
+from app.utils.revocation import revocation_list
+from app.schemas.auth_schema import Principal
+from app.utils.hashing import hashing_pool, pwd_context
 import os
+import time
+import uuid
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,23 +23,335 @@ logger = logging.getLogger(__name__)
 
 SECRET_KEY = os.getenv("Secret_ket", "your-secret-key")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "2048"))
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_NEGATIVE_TTL = int(os.getenv("PRINCIPAL_NEGATIVE_TTL", "30"))
+
+TOKEN_CLAIMS_ENABLED = os.getenv("TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+TOKEN_VERSION_REFRESH_SECONDS = int(os.getenv("TOKEN_VERSION_REFRESH_SECONDS", "30"))
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+class PrincipalCache:
+    """Bounded, TTL'd cache of authenticated members keyed by token subject.
+
+    Deleted or unknown subjects are remembered for a shorter negative TTL so a
+    stale token cannot hammer the database either. Entries are dropped through
+    ``invalidate_principal`` whenever a member document is changed.
+    """
+    def __init__(self, max_size=2048, ttl=60, negative_ttl=30):
+        self.entries = OrderedDict()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Tuple[bool, Optional[Member]]:
+        """Return ``(found, member)``; ``member`` is None for a cached miss"""
+        entry = self.entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        member, expire_at = entry
+        if time.monotonic() > expire_at:
+            del self.entries[user_id]
+            self.misses += 1
+            return False, None
+
+        self.entries.move_to_end(user_id)
+        if member is None:
+            self.negative_hits += 1
+            return True, None
+
+        self.hits += 1
+        # Handlers mutate current_user before saving, so never hand out the
+        # shared instance
+        return True, member.model_copy(deep=True)
+
+    def set(self, user_id: str, member: Optional[Member]):
+        """Cache a member, or a negative result when ``member`` is None"""
+        ttl = self.ttl if member is not None else self.negative_ttl
+        if user_id not in self.entries and len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        if member is not None:
+            member = member.model_copy(deep=True)
+        self.entries[user_id] = (member, time.monotonic() + ttl)
+        self.entries.move_to_end(user_id)
+
+    def invalidate(self, user_id: str) -> bool:
+        """Drop a cached member so the next request reloads it"""
+        if self.entries.pop(str(user_id), None) is not None:
+            self.invalidations += 1
+            return True
+        return False
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        avoided = self.hits + self.negative_hits
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(avoided / lookups, 4) if lookups else 0.0,
+            "db_lookups": self.misses,
+            "db_lookups_avoided": avoided,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=PRINCIPAL_CACHE_SIZE,
+    ttl=PRINCIPAL_CACHE_TTL,
+    negative_ttl=PRINCIPAL_NEGATIVE_TTL,
+)
+
+
+def invalidate_principal(user_id) -> bool:
+    """Forget the cached principal for a member after it has been changed"""
+    return principal_cache.invalidate(str(user_id))
+
+
+async def update_member_fields(member: Member, values: dict) -> Member:
+    """``$set`` just ``values`` on the stored member and return it as stored.
+
+    ``member`` may be the principal cache's copy, up to a TTL old, so it is
+    never saved whole: that would undo other writers' changes to role or
+    token_version, or re-create a deleted member.
+    """
+    updated = member
+    if values:
+        updated = await Member.find_one(Member.id == member.id).update(
+            {"$set": values}, response_type=UpdateResponse.NEW_DOCUMENT
+        )
+    if updated is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
+    invalidate_principal(member.id)
+    return updated
+
+
+class TokenVersionMap:
+    """Per-member token versions held in memory.
+
+    Only members whose version has ever been bumped are tracked, so the map
+    stays small. It is loaded at startup and re-polled periodically so bumps
+    made by other workers are picked up without a per-request document fetch.
+    """
+    def __init__(self, refresh_interval=30):
+        self.versions = {}
+        self.refresh_interval = refresh_interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Load versions and start polling for changes from other workers"""
+        await self.refresh()
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.create_task(self._poll())
+        logger.info(f"Loaded {len(self.versions)} token versions")
+        return self
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def refresh(self):
+        """Reload every non-zero token version from the members collection"""
+        cursor = get_collection(Member).find(
+            {"token_version": {"$gt": 0}}, {"token_version": 1}
+        )
+        async for doc in cursor:
+            user_id = str(doc["_id"])
+            # Versions only ever grow; keeping the max also preserves local
+            # bumps for members that have since been deleted
+            self.versions[user_id] = max(self.versions.get(user_id, 0), doc["token_version"])
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh token versions")
+
+    def current(self, user_id: str) -> int:
+        return self.versions.get(user_id, 0)
+
+    def set(self, user_id, version: int):
+        user_id = str(user_id)
+        self.versions[user_id] = max(self.versions.get(user_id, 0), version)
+
+
+token_versions = TokenVersionMap(refresh_interval=TOKEN_VERSION_REFRESH_SECONDS)
+
+
+def bump_token_version(member: Member) -> int:
+    """Invalidate every token issued so far to ``member``.
+
+    Call before saving the member; call ``record_token_version`` once the
+    save succeeded so this worker starts rejecting old tokens immediately.
+    """
+    member.token_version = (member.token_version or 0) + 1
+    return member.token_version
+
+
+def record_token_version(member: Member):
+    """Publish a saved member's token version and drop its cached principal"""
+    token_versions.set(member.id, member.token_version)
+    invalidate_principal(member.id)
+
+
+async def revoke_member_tokens(member: Member):
+    """Reject a member's outstanding access tokens on every worker.
+
+    For members about to be deleted: the token version map is rebuilt from
+    existing members only, so a version bump alone would not reach other
+    workers.
+    """
+    access_expiry = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    await revocation_list.revoke(str(member.id), access_expiry)
+
+
+def build_token_claims(member: Member) -> dict:
+    """Claims for a member's access token.
+
+    With ``TOKEN_CLAIMS`` enabled the token also carries role, active flag,
+    departments and token version so role checks need no database read.
+    """
+    claims = {"sub": str(member.id), "ver": member.token_version}
+    if TOKEN_CLAIMS_ENABLED:
+        claims.update({
+            "role": member.role,
+            "act": member.is_active,
+            "dep": member.departments or [],
+        })
+    return claims
+
+
 def create_access_token(data: dict):
     """Create a JWT access token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     if "sub" in to_encode:
         to_encode["sub"] = str(to_encode["sub"])
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+async def create_refresh_token(member: Member, family_id: Optional[str] = None) -> str:
+    """Create and record a single-use refresh token"""
+    jti = uuid.uuid4().hex
+    family_id = family_id or uuid.uuid4().hex
+    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    await RefreshToken(
+        jti=jti,
+        family_id=family_id,
+        member_id=str(member.id),
+        expires_at=expire,
+    ).insert()
+    return jwt.encode(
+        {"sub": str(member.id), "jti": jti, "fam": family_id, "type": "refresh", "exp": expire},
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+
+async def issue_tokens(member: Member, family_id: Optional[str] = None) -> dict:
+    """Access/refresh token pair for a member; ``family_id`` continues a rotation chain"""
+    family_id = family_id or uuid.uuid4().hex
+    claims = build_token_claims(member)
+    claims["fam"] = family_id
+    return {
+        "access_token": create_access_token(data=claims),
+        "refresh_token": await create_refresh_token(member, family_id),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+async def revoke_token_family(family_id: str):
+    """Kill a login session: its refresh tokens and any access token it issued"""
+    await get_collection(RefreshToken).update_many(
+        {"family_id": family_id}, {"$set": {"revoked": True}}
+    )
+    access_expiry = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    await revocation_list.revoke(family_id, access_expiry)
+
+
+async def rotate_refresh_token(refresh_token: str) -> dict:
+    """Exchange a refresh token for a new pair, detecting reuse of rotated tokens"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        logger.warning(f"Refresh token rejected: {str(e)}")
+        raise credentials_exception
+    if payload.get("type") != "refresh":
+        raise credentials_exception
+
+    # Claim the token atomically so two concurrent refreshes cannot both win
+    claimed = await get_collection(RefreshToken).update_one(
+        {"jti": payload.get("jti"), "used_at": None, "revoked": False},
+        {"$set": {"used_at": datetime.utcnow()}},
+    )
+    if claimed.modified_count == 0:
+        logger.warning(f"Refresh token reuse detected for family {payload.get('fam')}")
+        await revoke_token_family(payload["fam"])
+        raise credentials_exception
+
+    member = await Member.get(ObjectId(payload["sub"]))
+    if member is None or not member.is_active:
+        raise credentials_exception
+    return await issue_tokens(member, family_id=payload["fam"])
+
+
+def decode_access_token(token: str) -> dict:
+    """Decode a JWT and reject revoked, refresh or pre-version-bump tokens"""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise JWTError("Token has no subject")
+    if payload.get("type") == "refresh":
+        raise JWTError("Refresh token used as access token")
+    if payload.get("ver", 0) < token_versions.current(user_id):
+        raise JWTError("Token version is stale")
+    if revocation_list.is_revoked(payload.get("jti"), payload.get("fam"), user_id):
+        raise JWTError("Token has been revoked")
+    return payload
+
+
+async def _load_member(user_id: str, credentials_exception: HTTPException) -> Member:
+    logger.debug(f"Authenticating user ID: {user_id}")
+    found, user = principal_cache.get(user_id)
+    if not found:
+        user = await Member.get(ObjectId(user_id))
+        principal_cache.set(user_id, user)
+    if user is None:
+        logger.warning(f"User not found: {user_id}")
+        raise credentials_exception
+    return user
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get current authenticated user from JWT"""
     credentials_exception = HTTPException(
@@ -38,24 +360,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        
-        logger.debug(f"Authenticating user ID: {user_id}")
-        user = await Member.get(ObjectId(user_id)
-                                )
-        if user is None:
-            logger.warning(f"User not found: {user_id}")
-            raise credentials_exception
-    
-        user_dict = user.dict()
-        user_dict["id"] = str(user_dict["id"])
-        user_dict.pop("password_hash", None)  
-        return user
-    
+        payload = decode_access_token(token)
+        return await _load_member(payload["sub"], credentials_exception)
 
+    except HTTPException:
+        raise
 
     except JWTError as e:
         logger.error(f"JWT validation error: {str(e)}")
@@ -67,6 +376,41 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal authentication error"
         )
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Get the caller's identity, straight from the token when it carries claims"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = decode_access_token(token)
+        if TOKEN_CLAIMS_ENABLED and "role" in payload:
+            return Principal(
+                id=payload["sub"],
+                role=payload["role"],
+                is_active=payload.get("act", True),
+                departments=payload.get("dep", []),
+                token_version=payload.get("ver", 0),
+            )
+        member = await _load_member(payload["sub"], credentials_exception)
+        return Principal.from_member(member)
+
+    except HTTPException:
+        raise
+
+    except JWTError as e:
+        logger.error(f"JWT validation error: {str(e)}")
+        raise credentials_exception
+
+    except Exception as e:
+        logger.exception(f"Unexpected error in get_current_principal")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal authentication error"
+        )
     
 
 
@@ -81,6 +425,16 @@ async def get_current_active_user(current_user: Member = Depends(get_current_use
     return current_user
 
 
+async def get_active_principal(principal: Principal = Depends(get_current_principal)):
+    """Ensure the current principal is active"""
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+    return principal
+
+
 
 def get_password_hash(password: str) -> str:
     """Generate password hash"""
@@ -90,4 +444,16 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash on the hashing pool"""
+    return await hashing_pool.hash(password)
+
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash on the hashing pool"""
+    return await hashing_pool.verify(plain_password, hashed_password)
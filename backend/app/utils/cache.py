@@ -1,12 +1,80 @@
 import asyncio
+import functools
+import hashlib
+import heapq
+import json
 import logging
-from typing import Any, Optional
+import os
+import pickle
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional, Union
 from collections import OrderedDict
+from bson import ObjectId
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Items inspected per container when estimating the size of a cached value
+SIZE_SAMPLE = 8
+
+# Lifetime of Redis tag sets; longer than any TTL the app caches for
+TAG_SET_TTL = 24 * 60 * 60
+
+class CacheBackend(ABC):
+    """Interface shared by every cache backend"""
+
+    async def init(self):
+        return self
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def get(self, key: str, default: Any = None) -> Any:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None,
+                  tags: Iterable[str] = ()):
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    async def clear(self):
+        ...
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry carrying any of ``tags``; returns entries removed"""
+        ...
+
+    async def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Get several keys at once; missing keys map to ``default``"""
+        return {key: await self.get(key, default) for key in keys}
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                       tags: Iterable[str] = ()):
+        """Set several keys at once with a shared TTL and tags"""
+        for key, value in items.items():
+            await self.set(key, value, ttl, tags)
+
+    def stats(self) -> dict:
+        return {}
+
+
 class SimpleMemoryCache:
-    """In-memory cache implementation for development purposes"""
+    """In-memory cache implementation for development purposes.
+
+    Superseded by ``MemoryCache``; kept as the baseline for benchmarks.
+    """
     def __init__(self, max_size=1000, default_ttl=300):
         self.cache = OrderedDict()
         self.max_size = max_size
@@ -66,28 +134,632 @@ class SimpleMemoryCache:
             self.cache.clear()
             logger.info("Cache CLEARED")
 
-# Create cache instance (use SimpleMemoryCache for development)
-# For production, you would replace this with a Redis-based cache
-cache = SimpleMemoryCache(max_size=1000, default_ttl=300)
+
+_ATOMIC_TYPES = frozenset((str, bytes, int, float, bool, type(None)))
+
+
+def approximate_size(value: Any, _depth: int = 0) -> int:
+    """Rough deep size of a cached value in bytes.
+
+    Large containers are sampled and extrapolated, and dict keys are not
+    counted (they are usually shared across records), so sizing a long
+    result list stays cheap.
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 3 or type(value) in _ATOMIC_TYPES:
+        return size
+    if isinstance(value, dict):
+        items = list(value.values())
+    elif isinstance(value, (list, tuple)):
+        items = value
+    elif isinstance(value, (set, frozenset)):
+        items = list(value)
+    elif hasattr(value, "__dict__"):
+        return size + approximate_size(vars(value), _depth + 1)
+    else:
+        return size
+    if not items:
+        return size
+
+    sample = items[:SIZE_SAMPLE]
+    sampled = 0
+    for item in sample:
+        if type(item) in _ATOMIC_TYPES:
+            sampled += sys.getsizeof(item)
+        else:
+            sampled += approximate_size(item, _depth + 1)
+    return size + sampled * len(items) // len(sample)
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache bounded by approximate memory use.
+
+    All operations are synchronous under the hood: the event loop is single
+    threaded, so no lock is needed and reads never wait on each other.
+    Expired entries are swept eagerly from an expiry heap by a background
+    task instead of lingering until the next read of the same key.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_size=10000,
+                 default_ttl=300, sweep_interval=5):
+        self.entries = OrderedDict()  # key -> (value, expire_at, size, tags)
+        self.expiry_heap = []  # (expire_at, key), may hold superseded entries
+        self.tag_index = {}  # tag -> set of keys
+        self.max_bytes = max_bytes
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Start the expiry sweeper"""
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+        logger.info(f"Initialized in-memory cache ({self.max_bytes} bytes, "
+                    f"{self.max_size} entries)")
+        return self
+
+    async def close(self):
+        """Stop the sweeper and drop all entries"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        self._clear()
+        logger.info("Closed in-memory cache")
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None,
+                  tags: Iterable[str] = ()):
+        """Set a value in the cache with optional TTL and tags"""
+        self._remove(key)
+        size = approximate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Cache SKIP (too large): {key}")
+            return
+
+        expire_at = time.monotonic() + (ttl or self.default_ttl)
+        tags = tuple(tags)
+        self.entries[key] = (value, expire_at, size, tags)
+        self.total_bytes += size
+        for tag in tags:
+            self.tag_index.setdefault(tag, set()).add(key)
+        heapq.heappush(self.expiry_heap, (expire_at, key))
+
+        while self.total_bytes > self.max_bytes or len(self.entries) > self.max_size:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+        logger.debug(f"Cache SET: {key}")
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """Get a value from the cache if it exists and hasn't expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if time.monotonic() > entry[1]:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    async def delete(self, key: str):
+        """Delete a value from the cache"""
+        if self._remove(key):
+            logger.debug(f"Cache DELETE: {key}")
+            return True
+        return False
+
+    async def clear(self):
+        """Clear all items from the cache"""
+        self._clear()
+        logger.info("Cache CLEARED")
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry carrying any of ``tags``"""
+        removed = 0
+        for tag in tags:
+            for key in list(self.tag_index.get(tag, ())):
+                removed += self._remove(key)
+        return removed
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed"""
+        now = time.monotonic()
+        removed = 0
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now:
+            expire_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            # Skip heap records superseded by a later set() of the same key
+            if entry is not None and entry[1] == expire_at:
+                self._remove(key)
+                removed += 1
+        self.expirations += removed
+
+        # Overwrites leave dead heap records behind; compact occasionally
+        if len(heap) > 2 * len(self.entries) + 1024:
+            self.expiry_heap = [(entry[1], key) for key, entry in self.entries.items()]
+            heapq.heapify(self.expiry_heap)
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "tags": len(self.tag_index),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry[2]
+        for tag in entry[3]:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+        return True
+
+    def _clear(self):
+        self.entries.clear()
+        self.expiry_heap.clear()
+        self.tag_index.clear()
+        self.total_bytes = 0
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Cache sweep failed")
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers, stored in any Redis-protocol server.
+
+    Values are pickled, keys are namespaced with ``prefix`` so ``clear`` only
+    touches this app's entries. Connection errors are logged and treated as
+    misses: a cache outage must never fail a request.
+    """
+    def __init__(self, url="redis://localhost:6379/0", prefix="gpcc:", default_ttl=300):
+        self.url = url
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+        self.client = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def init(self):
+        """Connect to the Redis server"""
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        self.client = redis.from_url(self.url)
+        await self.client.ping()
+        logger.info(f"Initialized Redis cache at {self.url}")
+        return self
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("Closed Redis cache")
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis GET failed for {key}: {str(e)}")
+            return default
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None,
+                  tags: Iterable[str] = ()):
+        await self.set_many({key: value}, ttl, tags)
+
+    async def delete(self, key: str):
+        try:
+            return bool(await self.client.delete(self.prefix + key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis DELETE failed for {key}: {str(e)}")
+            return False
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*", count=500):
+            await self.client.delete(key)
+        logger.info("Cache CLEARED")
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every key listed in the tag sets, then the sets themselves"""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return 0
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set().union(*members)
+            # Tag sets can still list keys that already expired or were removed
+            removed = await self.client.delete(*keys) if keys else 0
+            await self.client.delete(*tag_keys)
+            return removed
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis tag invalidation failed: {str(e)}")
+            return 0
+
+    async def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        """Fetch many keys in one MGET round trip"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            raws = await self.client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis MGET failed: {str(e)}")
+            return {key: default for key in keys}
+        result = {}
+        for key, raw in zip(keys, raws):
+            if raw is None:
+                self.misses += 1
+                result[key] = default
+            else:
+                self.hits += 1
+                result[key] = pickle.loads(raw)
+        return result
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                       tags: Iterable[str] = ()):
+        """Store many keys, and their tag memberships, in one pipelined round trip"""
+        if not items:
+            return
+        ttl = ttl or self.default_ttl
+        tags = tuple(tags)
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(self.prefix + key, pickle.dumps(value), ex=ttl)
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, *(self.prefix + key for key in items))
+                    # Tag sets must outlive their members or invalidation misses them
+                    pipe.expire(tag_key, max(ttl, TAG_SET_TTL))
+                await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis pipelined SET failed: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+
+class TieredCache(CacheBackend):
+    """Small per-worker L1 in front of a shared L2.
+
+    L1 entries live at most ``l1_ttl`` seconds, which bounds how long one
+    worker can serve a value another worker has already replaced in L2.
+    L2 stores ``(value, tags)`` so copies promoted into L1 keep their tags
+    and are reached by this worker's ``invalidate_tags``.
+    """
+    def __init__(self, l1: CacheBackend, l2: CacheBackend, l1_ttl=30):
+        self.l1 = l1
+        self.l2 = l2
+        self.l1_ttl = l1_ttl
+
+    async def init(self):
+        await self.l1.init()
+        await self.l2.init()
+        return self
+
+    async def close(self):
+        await self.l1.close()
+        await self.l2.close()
+
+    def _l1_ttl(self, ttl: Optional[int]) -> int:
+        return min(ttl, self.l1_ttl) if ttl else self.l1_ttl
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        value = await self.l1.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        entry = await self.l2.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        value, tags = entry
+        await self.l1.set(key, value, self.l1_ttl, tags)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None,
+                  tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        await self.l2.set(key, (value, tags), ttl, tags)
+        await self.l1.set(key, value, self._l1_ttl(ttl), tags)
+
+    async def delete(self, key: str):
+        await self.l1.delete(key)
+        return await self.l2.delete(key)
+
+    async def clear(self):
+        await self.l1.clear()
+        await self.l2.clear()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        # Other workers' L1 copies age out within l1_ttl
+        tags = tuple(tags)
+        await self.l1.invalidate_tags(tags)
+        return await self.l2.invalidate_tags(tags)
+
+    async def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        keys = list(keys)
+        result = await self.l1.get_many(keys, _MISSING)
+        missing = [key for key, value in result.items() if value is _MISSING]
+        if missing:
+            fetched = await self.l2.get_many(missing, _MISSING)
+            for key, entry in fetched.items():
+                if entry is not _MISSING:
+                    value, tags = entry
+                    await self.l1.set(key, value, self.l1_ttl, tags)
+                    result[key] = value
+        return {key: default if value is _MISSING else value for key, value in result.items()}
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                       tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        await self.l2.set_many({key: (value, tags) for key, value in items.items()}, ttl, tags)
+        await self.l1.set_many(items, self._l1_ttl(ttl), tags)
+
+    def stats(self) -> dict:
+        return {"l1": self.l1.stats(), "l2": self.l2.stats()}
+
+
+def create_cache_backend() -> CacheBackend:
+    """Build the cache backend selected by ``CACHE_BACKEND`` (memory, redis, tiered)"""
+    kind = os.getenv("CACHE_BACKEND", "memory").lower()
+    default_ttl = int(os.getenv("CACHE_DEFAULT_TTL", "300"))
+
+    def memory(max_bytes: int) -> MemoryCache:
+        return MemoryCache(
+            max_bytes=max_bytes,
+            max_size=int(os.getenv("CACHE_MAX_ENTRIES", "10000")),
+            default_ttl=default_ttl,
+        )
+
+    if kind == "memory":
+        return memory(int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+    redis_cache = RedisCache(
+        url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        prefix=os.getenv("CACHE_KEY_PREFIX", "gpcc:"),
+        default_ttl=default_ttl,
+    )
+    if kind == "redis":
+        return redis_cache
+    if kind == "tiered":
+        return TieredCache(
+            l1=memory(int(os.getenv("CACHE_L1_MAX_BYTES", str(8 * 1024 * 1024)))),
+            l2=redis_cache,
+            l1_ttl=int(os.getenv("CACHE_L1_TTL", "30")),
+        )
+    raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+
+
+class Cache(CacheBackend):
+    """Application cache; ``init()`` picks the configured backend.
+
+    Modules import this object once at import time, so the backend is
+    swapped behind it rather than rebinding the module-level name.
+    """
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or MemoryCache()
+
+    async def init(self):
+        self.backend = create_cache_backend()
+        await self.backend.init()
+        return self
+
+    async def close(self):
+        await self.backend.close()
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return await self.backend.get(key, default)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None,
+                  tags: Iterable[str] = ()):
+        await self.backend.set(key, value, ttl, tags)
+
+    async def delete(self, key: str):
+        return await self.backend.delete(key)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        return await self.backend.invalidate_tags(tags)
+
+    async def get_many(self, keys: Iterable[str], default: Any = None) -> Dict[str, Any]:
+        return await self.backend.get_many(keys, default)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None,
+                       tags: Iterable[str] = ()):
+        await self.backend.set_many(items, ttl, tags)
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, **self.backend.stats()}
+
+
+_MISSING = object()
+
+# Create cache instance; the backend is chosen from CACHE_BACKEND in cache.init()
+cache = Cache()
+
+# In-flight loads per cache key, shared by concurrent callers (single flight)
+_inflight: Dict[str, asyncio.Task] = {}
+# Tags of the entry each in-flight load will write, for invalidate_tags
+_inflight_tags: Dict[str, tuple] = {}
+# Wall clock for @cached freshness; replaceable without touching time.time
+_wall_clock: Callable[[], float] = time.time
+
+
+def _jittered(ttl: int, jitter: float) -> int:
+    """Spread expiries so keys cached together do not all expire together"""
+    if not jitter:
+        return ttl
+    return max(1, round(ttl * random.uniform(1 - jitter, 1 + jitter)))
+
+
+def _log_refresh_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background cache refresh failed", exc_info=task.exception())
+
+
+def _single_flight(key: str, load, tags: tuple = ()) -> asyncio.Task:
+    """Start ``load()`` for ``key`` unless a load for it is already running"""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(load())
+        _inflight[key] = task
+        _inflight_tags[key] = tags
+        task.add_done_callback(lambda done: _forget_load(key, done))
+    return task
+
+
+def _forget_load(key: str, task: asyncio.Task):
+    # A voided load finishing must not unregister the load that replaced it
+    if _inflight.get(key) is task:
+        del _inflight[key]
+        _inflight_tags.pop(key, None)
+
+
+def _is_current_load(key: str) -> bool:
+    """Whether the running load is still the registered one for ``key``"""
+    return _inflight.get(key) is asyncio.current_task()
+
+
+def _void_loads(tags: Iterable[str]):
+    """Detach in-flight loads carrying any of ``tags`` so they do not cache
+    what they read before the write, and the next caller starts afresh"""
+    tags = set(tags)
+    for key, load_tags in list(_inflight_tags.items()):
+        if tags.intersection(load_tags):
+            del _inflight[key]
+            del _inflight_tags[key]
+
+
+def _key_part(value: Any) -> Any:
+    """JSON-safe, order-independent form of one cache key argument"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return _key_part(value.value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return _key_part(value.model_dump())
+    if isinstance(value, dict):
+        return {str(k): _key_part(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_key_part(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_key_part(item) for item in value), key=repr)
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def make_cache_key(func, args: tuple, kwargs: dict) -> str:
+    """Deterministic cache key for a call, stable across workers and restarts"""
+    payload = json.dumps([_key_part(args), _key_part(kwargs)],
+                         sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha1(payload.encode()).hexdigest()
+    return f"{func.__module__}:{func.__qualname__}:{digest}"
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """Drop every cached entry carrying any of ``tags``"""
+    _void_loads(tags)
+    removed = await cache.invalidate_tags(tags)
+    logger.debug(f"Cache INVALIDATE {tags}: {removed} entries")
+    return removed
+
 
 # Decorator for caching async functions
-def cached(ttl: int = 300):
-    """Decorator to cache the result of an async function"""
+def cached(ttl: int = 300, stale_ttl: int = 0, jitter: float = 0.1,
+           tags: Union[Iterable[str], Callable[..., Iterable[str]]] = ()):
+    """Decorator to cache the result of an async function.
+
+    Concurrent misses for the same key share one call of ``func``. Any
+    result, including ``None``, is cached. With ``stale_ttl`` an expired
+    value keeps being served for that long while a single background task
+    refreshes it. ``jitter`` randomises the TTL by that fraction.
+
+    ``tags`` (or a callable taking the call's arguments and returning tags)
+    label the entry for ``invalidate_tags``. A load still running when one of
+    its tags is invalidated returns its result but does not cache it, and
+    later callers start a fresh load instead of joining it.
+    """
     def decorator(func):
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate a unique key based on function and arguments
-            key = f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
-            
-            # Try to get cached result
-            cached_result = await cache.get(key)
-            if cached_result is not None:
-                return cached_result
-                
-            # Call function if not in cache
-            result = await func(*args, **kwargs)
-            
-            # Store result in cache
-            await cache.set(key, result, ttl)
-            return result
+            key = make_cache_key(func, args, kwargs)
+            entry_tags = tuple(tags(*args, **kwargs) if callable(tags) else tags)
+
+            async def load():
+                result = await func(*args, **kwargs)
+                if not _is_current_load(key):
+                    # Invalidated while loading; the result may predate the write
+                    return result
+                fresh_for = _jittered(ttl, jitter)
+                # Wall-clock freshness so it means the same thing in a shared L2
+                await cache.set(key, (result, _wall_clock() + fresh_for),
+                                fresh_for + stale_ttl, entry_tags)
+                return result
+
+            entry = await cache.get(key, _MISSING)
+            if entry is not _MISSING:
+                result, fresh_until = entry
+                if _wall_clock() >= fresh_until and key not in _inflight:
+                    _single_flight(key, load, entry_tags).add_done_callback(_log_refresh_failure)
+                return result
+
+            # Shield so a cancelled caller does not cancel the shared load
+            return await asyncio.shield(_single_flight(key, load, entry_tags))
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
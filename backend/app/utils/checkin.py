@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import os
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+from app.database.connection import get_collection
+from app.models.attendance_model import AttendanceCheckIn
+from app.schemas.attendance_schema import CheckInBatchResult, KioskCheckIn
+from app.utils.attendance_rollup import record_checkins
+from app.utils.cohorts import cohort_index
+
+logger = logging.getLogger(__name__)
+
+CHECKIN_FLUSH_SIZE = int(os.getenv("CHECKIN_FLUSH_SIZE", "500"))
+CHECKIN_FLUSH_SECONDS = float(os.getenv("CHECKIN_FLUSH_SECONDS", "1.0"))
+# Past this many unflushed check-ins new ones are refused with a 503
+CHECKIN_MAX_BUFFER = int(os.getenv("CHECKIN_MAX_BUFFER", "20000"))
+# Recent (member, event) pairs remembered to answer repeat taps in memory
+CHECKIN_DEDUP_SIZE = int(os.getenv("CHECKIN_DEDUP_SIZE", "50000"))
+CHECKIN_RETRY_AFTER = int(os.getenv("CHECKIN_RETRY_AFTER", "2"))
+# Kiosk uploads: limits on the decompressed body and on rows per request
+KIOSK_MAX_BYTES = int(os.getenv("KIOSK_MAX_BYTES", str(20 * 1024 * 1024)))
+KIOSK_MAX_ROWS = int(os.getenv("KIOSK_MAX_ROWS", "20000"))
+
+DUPLICATE_KEY = 11000
+
+# Per-row outcome codes in CheckInBatchResult.status
+INSERTED, DUPLICATE, ERROR = "i", "d", "e"
+
+
+class CheckInBuffer:
+    """Accepts check-ins in memory and writes them to Mongo in batches.
+
+    A check-in is acknowledged as soon as it is buffered; the flusher writes
+    the buffer with one unordered ``insert_many`` whenever ``flush_size``
+    check-ins are waiting or ``flush_interval`` seconds have passed. Repeat
+    taps for the same (member, event) are answered from a bounded map of
+    recent check-ins, and the unique index drops any that slip through from
+    other workers. ``close()`` flushes whatever is left.
+    """
+    def __init__(self, flush_size=500, flush_interval=1.0, max_buffer=20000,
+                 dedup_size=50000, retry_after=2):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dedup_size = dedup_size
+        self.retry_after = retry_after
+        self.buffer: List[dict] = []
+        self.recent: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+        self.full = asyncio.Event()
+        self.accepted = 0
+        self.duplicates = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def init(self):
+        """Start the background flusher"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Started check-in buffer (flush at {self.flush_size} "
+                        f"or every {self.flush_interval}s)")
+        return self
+
+    async def close(self):
+        """Stop the flusher and write everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            # An interrupted flush puts its batch back before the task ends
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for _ in range(3):
+            if not self.buffer:
+                break
+            await self.flush()
+        if self.buffer:
+            logger.error(f"Dropping {len(self.buffer)} check-ins that could not be written")
+        logger.info("Closed check-in buffer")
+
+    def add(self, member_id: str, event_id: str, role: str,
+            age_group: Optional[str] = None) -> Tuple[dict, bool]:
+        """Buffer a check-in; returns the record and whether it is new"""
+        key = (member_id, event_id)
+        existing = self.recent.get(key)
+        if existing is not None:
+            self.duplicates += 1
+            return existing, False
+        if len(self.buffer) >= self.max_buffer:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Check-in is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        record = {
+            "_id": ObjectId(),
+            "member_id": member_id,
+            "event_id": event_id,
+            "check_in_time": datetime.utcnow(),
+            "role": role,
+            "age_group": age_group,
+        }
+        self.buffer.append(record)
+        self.recent[key] = record
+        if len(self.recent) > self.dedup_size:
+            self.recent.popitem(last=False)
+        self.accepted += 1
+        if len(self.buffer) >= self.flush_size:
+            self.full.set()
+        return record, True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.full.clear()
+            if self.buffer:
+                await self.flush()
+
+    async def flush(self) -> bool:
+        """Write the buffered check-ins; failed batches go back to the buffer"""
+        async with self._lock:
+            batch, self.buffer = self.buffer, []
+            if not batch:
+                return True
+            duplicates = []
+            written_at = datetime.utcnow()
+            for record in batch:
+                record["written_at"] = written_at
+            try:
+                await get_collection(AttendanceCheckIn).insert_many(batch, ordered=False)
+                inserted = batch
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                failed = {error["index"] for error in errors}
+                retry = [batch[error["index"]] for error in errors if error.get("code") != DUPLICATE_KEY]
+                duplicates = [batch[error["index"]] for error in errors if error.get("code") == DUPLICATE_KEY]
+                inserted = [record for index, record in enumerate(batch) if index not in failed]
+                if retry:
+                    logger.error(f"{len(retry)} check-ins failed to write, will retry")
+                    self.buffer[:0] = retry
+            except asyncio.CancelledError:
+                # Requeue; records that did land come back as duplicates of their own _id
+                self.buffer[:0] = batch
+                raise
+            except Exception:
+                logger.exception(f"Check-in flush of {len(batch)} records failed, will retry")
+                self.buffer[:0] = batch
+                self.failed_flushes += 1
+                return False
+            inserted += await self._written_earlier(duplicates)
+            self.written += len(inserted)
+            self.flushes += 1
+            await record_checkins(inserted)
+            cohort_index.add(inserted)
+            return True
+
+    async def _written_earlier(self, duplicates: List[dict]) -> List[dict]:
+        """Duplicates that are this buffer's own records, stored by an interrupted flush.
+
+        A requeued batch may have partly landed before the flush was cut off;
+        those rows come back as duplicate keys but were never added to the
+        rollups or the cohort index. They are recognised by their ``_id``.
+        """
+        if not duplicates:
+            return []
+        try:
+            return await get_collection(AttendanceCheckIn).find(
+                {"_id": {"$in": [record["_id"] for record in duplicates]}}
+            ).to_list(None)
+        except Exception:
+            logger.exception(f"Could not look up {len(duplicates)} duplicate check-ins; "
+                             f"rebuild the rollups if a flush was interrupted")
+            return []
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self.buffer),
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Uploads are limited to {KIOSK_MAX_BYTES} bytes and {KIOSK_MAX_ROWS} rows",
+    )
+
+
+async def read_upload(request: Request) -> bytes:
+    """The request body, refused with a 413 as soon as it passes KIOSK_MAX_BYTES"""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > KIOSK_MAX_BYTES:
+        raise _upload_too_large()
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > KIOSK_MAX_BYTES:
+            raise _upload_too_large()
+    return bytes(body)
+
+
+def decode_ndjson(body: bytes, gzipped: bool = False) -> List[bytes]:
+    """Non-empty lines of an NDJSON upload, gunzipped when needed"""
+    too_large = _upload_too_large()
+    if len(body) > KIOSK_MAX_BYTES:
+        raise too_large
+    if gzipped or body[:2] == b"\x1f\x8b":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = inflater.decompress(body, KIOSK_MAX_BYTES)
+        except zlib.error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid gzip body")
+        # Stop at the limit instead of inflating a bomb
+        if inflater.unconsumed_tail:
+            raise too_large
+        # A cut-off upload would otherwise pass as a shorter batch, and a second
+        # gzip member would be dropped without a word
+        if not inflater.eof:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Truncated gzip body")
+        if inflater.unused_data:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Unexpected data after the gzip stream")
+    lines = [line for line in body.splitlines() if line.strip()]
+    if len(lines) > KIOSK_MAX_ROWS:
+        raise too_large
+    return lines
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first.get("loc", ()))
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+async def write_checkin_batch(lines: List[bytes]) -> CheckInBatchResult:
+    """Insert a kiosk's offline check-ins in one unordered bulk write.
+
+    Rows already stored (or repeated within the upload) are reported as
+    duplicates, so re-sending the same upload is harmless.
+    """
+    statuses = [ERROR] * len(lines)
+    errors = {}
+    docs, rows, seen = [], [], set()
+    now = datetime.utcnow()
+    for index, line in enumerate(lines):
+        try:
+            row = KioskCheckIn.model_validate_json(line)
+        except ValidationError as e:
+            errors[index] = _validation_message(e)
+            continue
+        if not (ObjectId.is_valid(row.member_id) and ObjectId.is_valid(row.event_id)):
+            errors[index] = "member_id and event_id must be object ids"
+            continue
+        key = (row.member_id, row.event_id)
+        if key in seen:
+            statuses[index] = DUPLICATE
+            continue
+        seen.add(key)
+        docs.append({
+            "member_id": row.member_id,
+            "event_id": row.event_id,
+            "check_in_time": row.check_in_time or now,
+            "role": row.role,
+            "age_group": row.age_group,
+        })
+        rows.append(index)
+
+    if docs:
+        failed = {}
+        written_at = datetime.utcnow()
+        for doc in docs:
+            doc["written_at"] = written_at
+        try:
+            await get_collection(AttendanceCheckIn).bulk_write(
+                [InsertOne(doc) for doc in docs], ordered=False
+            )
+        except BulkWriteError as e:
+            failed = {error["index"]: error for error in e.details.get("writeErrors", [])}
+        for position, index in enumerate(rows):
+            error = failed.get(position)
+            if error is None:
+                statuses[index] = INSERTED
+            elif error.get("code") == DUPLICATE_KEY:
+                statuses[index] = DUPLICATE
+            else:
+                errors[index] = error.get("errmsg", "write failed")[:200]
+        stored = [doc for position, doc in enumerate(docs) if position not in failed]
+        await record_checkins(stored)
+        cohort_index.add(stored)
+
+    status_line = "".join(statuses)
+    return CheckInBatchResult(
+        received=len(lines),
+        inserted=status_line.count(INSERTED),
+        duplicates=status_line.count(DUPLICATE),
+        status=status_line,
+        errors=errors,
+    )
+
+
+checkin_buffer = CheckInBuffer(
+    flush_size=CHECKIN_FLUSH_SIZE,
+    flush_interval=CHECKIN_FLUSH_SECONDS,
+    max_buffer=CHECKIN_MAX_BUFFER,
+    dedup_size=CHECKIN_DEDUP_SIZE,
+    retry_after=CHECKIN_RETRY_AFTER,
+)
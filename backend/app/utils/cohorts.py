@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from app.database.connection import get_collection
+from app.models.attendance_model import (
+    AttendanceBitmap, AttendanceBitmapMembers, AttendanceBitmapSnapshot, AttendanceCheckIn,
+)
+
+logger = logging.getLogger(__name__)
+
+COHORT_SYNC_SECONDS = int(os.getenv("COHORT_SYNC_SECONDS", "30"))
+COHORT_SNAPSHOT_SECONDS = int(os.getenv("COHORT_SNAPSHOT_SECONDS", "900"))
+# Each sync re-reads this far back; setting a bit twice is harmless, missing one is not
+COHORT_SYNC_OVERLAP_SECONDS = int(os.getenv("COHORT_SYNC_OVERLAP_SECONDS", "300"))
+COHORT_SNAPSHOTS_KEPT = 2
+# Member ids per snapshot chunk document, well under the 16MB document limit
+COHORT_MEMBERS_PER_CHUNK = 10000
+
+
+def _bitset(ordinals: Iterable[int]) -> int:
+    """Python int with the given bits set, built in one pass over a bytearray"""
+    ordinals = list(ordinals)
+    if not ordinals:
+        return 0
+    buffer = bytearray(max(ordinals) // 8 + 1)
+    for ordinal in ordinals:
+        buffer[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(buffer, "little")
+
+
+def _ordinals(bits: int) -> List[int]:
+    return [i for i, bit in enumerate(bin(bits)[:1:-1]) if bit == "1"]
+
+
+class AttendanceBitmapIndex:
+    """Per-service attendance as bitsets over member ordinals.
+
+    Every member seen at a check-in gets an ordinal; each service (event) keeps
+    one Python int whose bit ``i`` is set when member ``i`` attended, so cohort
+    questions become a handful of whole-set AND/OR/NOT operations instead of
+    set arithmetic over attendance records.
+
+    The index loads the latest persisted snapshot in the background, then
+    tails ``attendance_records`` by ``written_at`` every ``sync_interval`` seconds,
+    which also picks up other workers' and kiosks' check-ins. Check-ins
+    written by this worker are applied immediately via ``add()``. Snapshots
+    are written every ``snapshot_interval`` seconds when something changed
+    and again on shutdown.
+    """
+    def __init__(self, sync_interval=30, snapshot_interval=900, overlap=300):
+        self.sync_interval = sync_interval
+        self.snapshot_interval = snapshot_interval
+        self.overlap = overlap
+        self.members: List[str] = []
+        self.ordinal: Dict[str, int] = {}
+        self.bits: Dict[str, int] = {}
+        self.first_seen: Dict[str, datetime] = {}
+        self.synced_to: Optional[datetime] = None
+        self.loaded = False
+        self.dirty = False
+        self.snapshots = 0
+        self._order: Optional[List[str]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Start loading and syncing in the background"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def close(self):
+        """Stop syncing and persist what changed since the last snapshot"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.loaded and self.dirty:
+            try:
+                await self.snapshot()
+            except Exception:
+                logger.exception("Failed to write the cohort index snapshot")
+
+    def add(self, records: Iterable[dict]):
+        """Apply freshly stored check-ins; ignored until loaded, the sync covers them"""
+        if self.loaded:
+            self._apply(records)
+
+    def _apply(self, records: Iterable[dict]):
+        by_service = defaultdict(list)
+        for record in records:
+            member_id = record["member_id"]
+            ordinal = self.ordinal.get(member_id)
+            if ordinal is None:
+                ordinal = self.ordinal[member_id] = len(self.members)
+                self.members.append(member_id)
+            event_id = record["event_id"]
+            by_service[event_id].append(ordinal)
+            seen = self.first_seen.get(event_id)
+            if seen is None or record["check_in_time"] < seen:
+                self.first_seen[event_id] = record["check_in_time"]
+                self._order = None
+        for event_id, ordinals in by_service.items():
+            current = self.bits.get(event_id, 0)
+            merged = current | _bitset(ordinals)
+            if merged != current:
+                self.bits[event_id] = merged
+                self.dirty = True
+
+    async def _run(self):
+        while not self.loaded:
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Failed to load the cohort index, will retry")
+                await asyncio.sleep(self.sync_interval)
+        last_snapshot = time.monotonic()
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+                if self.dirty and time.monotonic() - last_snapshot >= self.snapshot_interval:
+                    await self.snapshot()
+                    last_snapshot = time.monotonic()
+            except Exception:
+                logger.exception("Failed to sync the cohort index")
+
+    async def load(self):
+        """Start from the latest snapshot and catch up on newer check-ins"""
+        started = time.perf_counter()
+        self.members, self.ordinal, self.bits, self.first_seen = [], {}, {}, {}
+        self.synced_to, self._order = None, None
+        manifest = await get_collection(AttendanceBitmapSnapshot).find_one({}, sort=[("taken_at", -1)])
+        if manifest is not None:
+            chunks = get_collection(AttendanceBitmapMembers).find(
+                {"snapshot_id": str(manifest["_id"])}, {"members": 1}
+            ).sort("offset", 1)
+            async for chunk in chunks:
+                self.members.extend(chunk["members"])
+            if len(self.members) != manifest["members"]:
+                raise RuntimeError(f"Cohort snapshot {manifest['_id']} has {len(self.members)} "
+                                   f"of its {manifest['members']} members")
+            self.ordinal = {member_id: i for i, member_id in enumerate(self.members)}
+            cursor = get_collection(AttendanceBitmap).find({"snapshot_id": str(manifest["_id"])})
+            async for doc in cursor:
+                self.bits[doc["event_id"]] = int.from_bytes(doc["bits"], "little")
+                self.first_seen[doc["event_id"]] = doc["first_check_in"]
+            self.synced_to = manifest["synced_to"]
+        await self.sync()
+        self.loaded = True
+        logger.info(f"Loaded cohort index: {len(self.members)} members, {len(self.bits)} services "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    async def sync(self, batch_size: int = 50000):
+        """Apply check-ins stored since the last sync"""
+        started = datetime.utcnow()
+        query = {}
+        if self.synced_to is not None:
+            since = self.synced_to - timedelta(seconds=self.overlap)
+            query["written_at"] = {"$gte": since}
+        cursor = get_collection(AttendanceCheckIn).find(
+            query, {"_id": 0, "member_id": 1, "event_id": 1, "check_in_time": 1}
+        )
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                self._apply(batch)
+                batch = []
+        self._apply(batch)
+        self.synced_to = started
+
+    async def snapshot(self):
+        """Persist the index; older snapshots beyond the last few are removed"""
+        snapshot_id = ObjectId()
+        docs = [
+            {
+                "snapshot_id": str(snapshot_id),
+                "event_id": event_id,
+                "first_check_in": self.first_seen[event_id],
+                "bits": bits.to_bytes((bits.bit_length() + 7) // 8, "little"),
+            }
+            for event_id, bits in self.bits.items()
+        ]
+        members, synced_to = list(self.members), self.synced_to or datetime.utcnow()
+        chunks = [
+            {"snapshot_id": str(snapshot_id), "offset": offset,
+             "members": members[offset:offset + COHORT_MEMBERS_PER_CHUNK]}
+            for offset in range(0, len(members), COHORT_MEMBERS_PER_CHUNK)
+        ]
+        self.dirty = False
+        bitmaps = get_collection(AttendanceBitmap)
+        member_chunks = get_collection(AttendanceBitmapMembers)
+        manifests = get_collection(AttendanceBitmapSnapshot)
+        try:
+            for offset in range(0, len(docs), 1000):
+                await bitmaps.insert_many(docs[offset:offset + 1000], ordered=False)
+            for chunk in chunks:
+                await member_chunks.insert_one(chunk)
+            # The manifest goes last so a reader never sees a half-written snapshot
+            await manifests.insert_one({
+                "_id": snapshot_id,
+                "taken_at": datetime.utcnow(),
+                "synced_to": synced_to,
+                "members": len(members),
+                "services": len(docs),
+            })
+        except BaseException:
+            self.dirty = True
+            await bitmaps.delete_many({"snapshot_id": str(snapshot_id)})
+            await member_chunks.delete_many({"snapshot_id": str(snapshot_id)})
+            raise
+        stale = await manifests.find({}, {"_id": 1}).sort("taken_at", -1).skip(COHORT_SNAPSHOTS_KEPT).to_list(None)
+        if stale:
+            stale_ids = [str(doc["_id"]) for doc in stale]
+            await bitmaps.delete_many({"snapshot_id": {"$in": stale_ids}})
+            await member_chunks.delete_many({"snapshot_id": {"$in": stale_ids}})
+            await manifests.delete_many({"_id": {"$in": [doc["_id"] for doc in stale]}})
+        self.snapshots += 1
+        logger.info(f"Wrote cohort index snapshot of {len(docs)} services")
+
+    def _services(self) -> List[str]:
+        """Services oldest first, by their first check-in"""
+        if not self.loaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Attendance index is still loading, please retry shortly",
+            )
+        if self._order is None:
+            self._order = sorted(self.bits, key=self.first_seen.__getitem__)
+        return self._order
+
+    def _union(self, services: Iterable[str]) -> int:
+        bits = 0
+        for event_id in services:
+            bits |= self.bits[event_id]
+        return bits
+
+    def _between(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        return [
+            event_id for event_id in self._services()
+            if (start is None or self.first_seen[event_id] >= start)
+            and (end is None or self.first_seen[event_id] < end)
+        ]
+
+    def attended_at_least(self, k: int, n: int) -> dict:
+        """Members at k or more of the last n services"""
+        services = self._services()[-n:]
+        # at_least[j]: members seen at j or more of the services so far
+        at_least = [-1] + [0] * k
+        for i, event_id in enumerate(services, start=1):
+            bits = self.bits[event_id]
+            for j in range(min(i, k), 0, -1):
+                at_least[j] |= at_least[j - 1] & bits
+        return self._cohort(at_least[k], services)
+
+    def streak(self, n: int) -> dict:
+        """Members at every one of the last n services"""
+        services = self._services()[-n:]
+        bits = self.bits[services[0]] if services else 0
+        for event_id in services[1:]:
+            bits &= self.bits[event_id]
+        return self._cohort(bits, services)
+
+    def first_timers(self, start: datetime, end: datetime) -> dict:
+        """Members whose first attendance fell in [start, end)"""
+        services = self._between(start, end)
+        before = self._union(self._between(None, start))
+        return self._cohort(self._union(services) & ~before, services)
+
+    def lapsed(self, since: datetime, lookback_start: Optional[datetime]) -> dict:
+        """Members who attended between lookback_start and since, but not after"""
+        services = self._between(lookback_start, since)
+        recent = self._union(self._between(since, None))
+        return self._cohort(self._union(services) & ~recent, services)
+
+    def _cohort(self, bits: int, services: List[str]) -> dict:
+        member_ids = [self.members[i] for i in _ordinals(bits)]
+        return {"count": len(member_ids), "services": services, "member_ids": member_ids}
+
+    def stats(self) -> dict:
+        return {
+            "loaded": int(self.loaded),
+            "members": len(self.members),
+            "services": len(self.bits),
+            "snapshots": self.snapshots,
+        }
+
+
+cohort_index = AttendanceBitmapIndex(
+    sync_interval=COHORT_SYNC_SECONDS,
+    snapshot_interval=COHORT_SNAPSHOT_SECONDS,
+    overlap=COHORT_SYNC_OVERLAP_SECONDS,
+)
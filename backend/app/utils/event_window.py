@@ -0,0 +1,122 @@
+import base64
+import bisect
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+from app.database.connection import get_read_collection
+from app.models.event_model import Event
+from app.utils.cache import cached
+
+logger = logging.getLogger(__name__)
+
+# The landing page shows the next few weeks; that window is kept precomputed
+EVENT_WINDOW_WEEKS = int(os.getenv("EVENT_WINDOW_WEEKS", "8"))
+EVENT_WINDOW_TTL = int(os.getenv("EVENT_WINDOW_TTL", "300"))
+
+Cursor = Tuple[datetime, ObjectId]
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Stored times are naive UTC; bring query parameters to the same form"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque keyset cursor for the (start_time, _id) of the last item on a page"""
+    raw = f"{doc['start_time'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, event_id = raw.split("|")
+        return datetime.fromisoformat(start_time), ObjectId(event_id)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def _sort_key(doc: dict) -> Cursor:
+    return doc["start_time"], doc["_id"]
+
+
+@cached(ttl=EVENT_WINDOW_TTL, stale_ttl=60, tags=("events",))
+async def load_event_window() -> dict:
+    """Published events overlapping the next EVENT_WINDOW_WEEKS, in keyset order.
+
+    Read from the primary: this runs right after event writes (see
+    refresh_event_window), and a lagging secondary would cache the old events
+    for the whole TTL. It is one query per TTL, so the primary can take it.
+    """
+    start = datetime.utcnow()
+    end = start + timedelta(weeks=EVENT_WINDOW_WEEKS)
+    docs = await get_read_collection(Event, "primary").find({
+        "is_published": True,
+        "end_time": {"$gte": start},
+        "start_time": {"$lt": end},
+    }).sort([("start_time", 1), ("_id", 1)]).to_list(None)
+    return {"from": start, "to": end, "events": docs}
+
+
+async def refresh_event_window():
+    """Rebuild the window after an event write so the next reader finds it warm"""
+    try:
+        await load_event_window()
+    except Exception as e:
+        logger.warning(f"Could not refresh the event window: {str(e)}")
+
+
+async def _query_events(start: datetime, end: Optional[datetime], event_type: Optional[str],
+                        after: Optional[Cursor], limit: int, projection: dict) -> List[dict]:
+    query = {"is_published": True, "end_time": {"$gte": start}}
+    if end is not None:
+        query["start_time"] = {"$lt": end}
+    if event_type:
+        query["event_type"] = event_type
+    if after is not None:
+        query["$or"] = [
+            {"start_time": {"$gt": after[0]}},
+            {"start_time": after[0], "_id": {"$gt": after[1]}},
+        ]
+    # start_time is always fetched so the next cursor can be built
+    return await get_read_collection(Event).find(
+        query, {**projection, "start_time": 1}
+    ).sort([("start_time", 1), ("_id", 1)]).limit(limit + 1).to_list(None)
+
+
+async def upcoming_events(start: Optional[datetime], end: Optional[datetime],
+                          event_type: Optional[str], cursor: Optional[str],
+                          limit: int, projection: dict) -> Tuple[List[dict], Optional[str]]:
+    """One page of upcoming events and the cursor for the next page.
+
+    Requests inside the cached window (the default) are answered from
+    memory; anything wider goes to Mongo with the same keyset ordering.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    window = await load_event_window()
+    start = utc_naive(start) if start else datetime.utcnow()
+    end = utc_naive(end) if end else window["to"]
+
+    if start >= window["from"] and end <= window["to"]:
+        events = window["events"]
+        position = bisect.bisect_right(events, after, key=_sort_key) if after else 0
+        page = []
+        for doc in events[position:]:
+            if doc["start_time"] >= end:
+                break
+            if doc["end_time"] < start or (event_type and doc.get("event_type") != event_type):
+                continue
+            page.append(doc)
+            if len(page) > limit:
+                break
+    else:
+        page = await _query_events(start, end, event_type, after, limit, projection)
+
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "32"))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "2"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashingPool:
+    """Runs bcrypt off the event loop on a dedicated thread pool.
+
+    bcrypt releases the GIL, so a small thread pool gives real parallelism
+    without the pickling cost of a process pool. Admission is bounded: once
+    ``max_workers + max_queue`` hashes are in flight, new callers get a 503
+    with ``Retry-After`` instead of queueing behind a login burst.
+    """
+    def __init__(self, max_workers=4, max_queue=32, retry_after=2):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def init(self):
+        """Start the worker threads"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="bcrypt",
+            )
+            logger.info(f"Initialized hashing pool ({self.max_workers} workers, "
+                        f"queue {self.max_queue})")
+        return self
+
+    async def close(self):
+        """Wait for in-flight hashes and stop the worker threads"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            logger.info("Closed hashing pool")
+
+    async def _run(self, func, *args):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            logger.warning("Hashing pool saturated, rejecting request")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        if self.executor is None:
+            await self.init()
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a hash without blocking the event loop"""
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+hashing_pool = HashingPool(
+    max_workers=HASH_POOL_SIZE,
+    max_queue=HASH_QUEUE_SIZE,
+    retry_after=HASH_RETRY_AFTER,
+)
@@ -0,0 +1,196 @@
+import bisect
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, tuned for API calls rather than batch jobs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """Base metric. Pymongo's monitoring threads update metrics off the event
+    loop, so updates and the scrape-time snapshot both hold ``lock``."""
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}",
+                f"# TYPE {self.name} {self.kind}",
+                *self.samples()]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = list(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self.lock:
+            self.values[labels] = value
+
+
+class GaugeFunc(Metric):
+    """Gauge whose values are read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames, read: Callable[[], Dict[Tuple, float]]):
+        super().__init__(name, help, labelnames)
+        self.read = read
+
+    def samples(self):
+        try:
+            values = self.read()
+        except Exception:
+            logger.exception(f"Failed to collect {self.name}")
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+                for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple, list] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, *labels, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self.lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in self.series.items()]
+        lines = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _flatten_stats(stats: dict, prefix: str = "") -> Dict[Tuple, float]:
+    values = {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            values.update(_flatten_stats(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[(f"{prefix}{key}",)] = value
+    return values
+
+
+def register_stats(name: str, help: str, read_stats: Callable[[], dict]) -> Metric:
+    """Expose a component's ``stats()`` dict as one gauge labelled by stat"""
+    return registry.register(GaugeFunc(
+        name, help, ("stat",), lambda: _flatten_stats(read_stats())
+    ))
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route"),
+))
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Requests by route template and status code",
+    ("method", "route", "status"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled",
+))
+mongo_commands_per_request = registry.register(Histogram(
+    "mongo_commands_per_request", "MongoDB commands issued per request",
+    ("route",), buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+))
+mongo_commands_total = registry.register(Counter(
+    "mongo_commands_total", "MongoDB commands by name and outcome",
+    ("command", "outcome"),
+))
+mongo_query_budget_exceeded = registry.register(Counter(
+    "mongo_query_budget_exceeded_total", "Requests that issued more Mongo commands than their route allows",
+    ("route",),
+))
+mongo_pool_wait = registry.register(Histogram(
+    "mongo_pool_wait_seconds", "Time spent waiting to check a connection out of the Mongo pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+))
+mongo_pool_checkout_failures = registry.register(Counter(
+    "mongo_pool_checkout_failures_total", "Connection checkouts that failed, by reason",
+    ("reason",),
+))
+mongo_pool_connections = registry.register(Gauge(
+    "mongo_pool_connections", "Mongo pool connections by state",
+    ("state",),
+))
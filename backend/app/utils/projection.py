@@ -0,0 +1,59 @@
+from functools import lru_cache
+from typing import Annotated, Dict, Iterable, Optional, Tuple, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, create_model
+
+# ObjectId from Mongo's _id, rendered as the string id clients already expect
+ObjectIdStr = Annotated[str, BeforeValidator(str)]
+
+
+def fields_query(description: str = "Comma separated fields to return"):
+    """The ``fields`` query parameter shared by list endpoints"""
+    return Query(None, description=description, examples=["id,title,start_time"])
+
+
+def parse_fields(fields: Optional[str], response_model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Validated field names for ``?fields=``, all of them when omitted; ``id`` always comes first"""
+    allowed = response_model.model_fields
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. "
+                       f"Allowed: {', '.join(allowed)}",
+            )
+    else:
+        requested = list(allowed)
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def mongo_projection(fields: Iterable[str]) -> Dict[str, int]:
+    """Inclusion projection for ``fields``, with ``id`` mapped to ``_id``"""
+    return {("_id" if name == "id" else name): 1 for name in fields}
+
+
+@lru_cache(maxsize=256)
+def projection_model(document: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Lightweight model holding only ``fields`` of a stored document.
+
+    Field types and defaults come from the document model, so it validates
+    raw Mongo documents (``_id`` included) and works with Beanie's
+    ``.project()``, whose projection is derived from these fields' aliases.
+    """
+    definitions = {}
+    for name in fields:
+        if name == "id":
+            definitions["id"] = (Optional[ObjectIdStr], Field(None, alias="_id"))
+            continue
+        field = document.model_fields[name]
+        if field.default_factory is not None:
+            definitions[name] = (field.annotation, Field(default_factory=field.default_factory))
+        else:
+            definitions[name] = (field.annotation, field.default)
+    return create_model(
+        f"{document.__name__}Projection",
+        __config__=ConfigDict(populate_by_name=True, arbitrary_types_allowed=True),
+        **definitions,
+    )
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Optional, Set
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.database.connection import get_collection
+from app.models.event_model import Event, EventRegistration, WaitlistEntry
+
+logger = logging.getLogger(__name__)
+
+# Most members promoted off one event's waitlist per round trip
+WAITLIST_BATCH_SIZE = int(os.getenv("WAITLIST_BATCH_SIZE", "50"))
+# Safety net for seats freed by other workers or edited capacity
+WAITLIST_SWEEP_SECONDS = int(os.getenv("WAITLIST_SWEEP_SECONDS", "60"))
+
+# Events with a seat free: no limit, or registered_count below it
+HAS_FREE_SEAT = {
+    "$or": [
+        {"max_attendees": None},
+        {"max_attendees": {"$lte": 0}},
+        {"$expr": {"$lt": [{"$ifNull": ["$registered_count", 0]}, "$max_attendees"]}},
+    ],
+}
+
+
+async def reserve_seat(event_id: ObjectId) -> bool:
+    """Take one seat if the event is open and not full, in a single atomic update.
+
+    While anyone is waitlisted, freed seats belong to the waitlist, so new
+    registrants are refused here and queue behind them.
+    """
+    result = await get_collection(Event).update_one(
+        {"_id": event_id, "is_published": True, "registration_required": True,
+         "waitlist_count": {"$not": {"$gt": 0}}, **HAS_FREE_SEAT},
+        {"$inc": {"registered_count": 1}},
+    )
+    return result.modified_count == 1
+
+
+async def release_seat(event_id: ObjectId, seats: int = 1):
+    """Give back seats taken by reserve_seat"""
+    await get_collection(Event).update_one(
+        {"_id": event_id, "registered_count": {"$gte": seats}},
+        {"$inc": {"registered_count": -seats}},
+    )
+
+
+
+async def backfill_registered_counts() -> int:
+    """Count the registrations of events created before seats were tracked.
+
+    reserve_seat reads a missing registered_count as zero, so such an event
+    would otherwise take max_attendees more registrations. Runs at startup,
+    before serving; returns the number of events updated.
+    """
+    events = get_collection(Event)
+    legacy = [doc["_id"] async for doc in events.find({"registered_count": {"$exists": False}}, {"_id": 1})]
+    if not legacy:
+        return 0
+    counts = {
+        row["_id"]: row["count"]
+        async for row in get_collection(EventRegistration).aggregate([
+            {"$match": {"event_id": {"$in": [str(event_id) for event_id in legacy]},
+                        "status": {"$ne": "cancelled"}}},
+            {"$group": {"_id": "$event_id", "count": {"$sum": 1}}},
+        ])
+    }
+    await events.bulk_write([
+        UpdateOne({"_id": event_id, "registered_count": {"$exists": False}},
+                  {"$set": {"registered_count": counts.get(str(event_id), 0)}})
+        for event_id in legacy
+    ], ordered=False)
+    logger.info(f"Backfilled registered_count on {len(legacy)} events")
+    return len(legacy)
+
+async def join_waitlist(event_id: ObjectId, member_id: str, member_name: str, role: str) -> int:
+    """Queue a member for a full event; returns their position"""
+    event = await get_collection(Event).find_one_and_update(
+        {"_id": event_id},
+        {"$inc": {"waitlist_seq": 1, "waitlist_count": 1}},
+        projection={"waitlist_seq": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    entry = WaitlistEntry(
+        event_id=str(event_id),
+        member_id=member_id,
+        member_name=member_name,
+        role=role,
+        position=event["waitlist_seq"],
+    )
+    try:
+        await entry.insert()
+    except DuplicateKeyError:
+        await get_collection(Event).update_one({"_id": event_id}, {"$inc": {"waitlist_count": -1}})
+        raise
+    return entry.position
+
+
+async def leave_waitlist(event_id: ObjectId, member_id: str) -> bool:
+    """Remove a member from an event's waitlist; False when they were not on it"""
+    result = await get_collection(WaitlistEntry).delete_one(
+        {"event_id": str(event_id), "member_id": member_id}
+    )
+    if not result.deleted_count:
+        return False
+    await get_collection(Event).update_one({"_id": event_id}, {"$inc": {"waitlist_count": -1}})
+    return True
+
+
+class WaitlistPromoter:
+    """Moves waitlisted members into freed seats in the background.
+
+    Cancellations call ``notify(event_id)``. The promoter then reserves as many
+    seats as are free (up to ``batch_size``) in one conditional update and
+    claims that many entries in position order. Claimed entries become
+    registrations with one ``insert_many``; unused seats are handed back.
+    Only the head of the event's waitlist is read, never its registrations.
+    A periodic sweep over events with ``waitlist_count > 0`` and a free seat
+    picks up seats freed by other workers or by a raised ``max_attendees``.
+    """
+    def __init__(self, batch_size=50, sweep_interval=60):
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+        self.pending: Set[ObjectId] = set()
+        self.wakeup = asyncio.Event()
+        self.promoted = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Start the promoter loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Started waitlist promoter")
+        return self
+
+    async def close(self):
+        """Stop the promoter loop"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self, event_id: ObjectId):
+        """A seat may have freed up for ``event_id``"""
+        self.pending.add(ObjectId(event_id))
+        self.wakeup.set()
+
+    async def _run(self):
+        last_sweep = time.monotonic()
+        while True:
+            # Wake for notifications, but never put the sweep off past its interval
+            remaining = last_sweep + self.sweep_interval - time.monotonic()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            if time.monotonic() - last_sweep >= self.sweep_interval:
+                last_sweep = time.monotonic()
+                await self._sweep()
+            while self.pending:
+                event_id = self.pending.pop()
+                try:
+                    await self.promote(event_id)
+                except Exception:
+                    logger.exception(f"Failed to promote waitlist for event {event_id}")
+
+    async def _sweep(self):
+        try:
+            cursor = get_collection(Event).find(
+                {"waitlist_count": {"$gt": 0}, **HAS_FREE_SEAT}, {"_id": 1}
+            )
+            async for doc in cursor:
+                self.pending.add(doc["_id"])
+        except Exception:
+            logger.exception("Waitlist sweep failed")
+
+    async def promote(self, event_id: ObjectId) -> int:
+        """Fill free seats of one event from its waitlist; returns members promoted"""
+        events = get_collection(Event)
+        waitlist = get_collection(WaitlistEntry)
+        promoted = 0
+        while True:
+            event = await events.find_one(
+                {"_id": event_id},
+                {"max_attendees": 1, "registered_count": 1, "waitlist_count": 1},
+            )
+            if not event or event.get("waitlist_count", 0) <= 0:
+                break
+            capacity = event.get("max_attendees") or 0
+            free = capacity - event.get("registered_count", 0) if capacity > 0 else self.batch_size
+            seats = min(free, self.batch_size, event["waitlist_count"])
+            if seats <= 0:
+                break
+
+            # Reserve the whole batch at once; retry if the count moved under us
+            current = event.get("registered_count", {"$exists": False})
+            reserved = await events.update_one(
+                {"_id": event_id, "registered_count": current},
+                {"$inc": {"registered_count": seats}},
+            )
+            if not reserved.modified_count:
+                continue
+
+            claimed = []
+            for _ in range(seats):
+                entry = await waitlist.find_one_and_delete(
+                    {"event_id": str(event_id)}, sort=[("position", 1)]
+                )
+                if entry is None:
+                    break
+                claimed.append(entry)
+
+            try:
+                inserted = await self._register(claimed)
+            except Exception:
+                # Put the claimed members back in line and hand the seats back
+                if claimed:
+                    await waitlist.insert_many(claimed, ordered=False)
+                await events.update_one({"_id": event_id}, {"$inc": {"registered_count": -seats}})
+                raise
+            unused = seats - inserted
+            update = {"waitlist_count": -len(claimed)}
+            if unused:
+                update["registered_count"] = -unused
+            await events.update_one({"_id": event_id}, {"$inc": update})
+
+            promoted += inserted
+            if len(claimed) < seats:
+                break
+        if promoted:
+            self.promoted += promoted
+            logger.info(f"Promoted {promoted} waitlisted members for event {event_id}")
+        return promoted
+
+    async def _register(self, entries) -> int:
+        """Insert registrations for claimed entries; returns how many were new"""
+        if not entries:
+            return 0
+        now = datetime.utcnow()
+        docs = [
+            {
+                "event_id": entry["event_id"],
+                "member_id": entry["member_id"],
+                "member_name": entry["member_name"],
+                "role": entry["role"],
+                "registration_time": now,
+                "status": "pending",
+            }
+            for entry in entries
+        ]
+        try:
+            result = await get_collection(EventRegistration).insert_many(docs, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            # Members who registered some other way keep their one seat
+            return e.details.get("nInserted", 0)
+
+    def stats(self) -> dict:
+        return {"pending": len(self.pending), "promoted": self.promoted}
+
+
+waitlist_promoter = WaitlistPromoter(
+    batch_size=WAITLIST_BATCH_SIZE,
+    sweep_interval=WAITLIST_SWEEP_SECONDS,
+)
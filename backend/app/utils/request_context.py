@@ -0,0 +1,23 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# Id of the request being handled, set by LoggingMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Id of the current request, or None outside a request"""
+    return request_id_var.get()
+
+
+class RequestStats:
+    """Work done on behalf of one request, filled in by instrumentation"""
+    __slots__ = ("mongo_commands", "mongo_time_ms")
+
+    def __init__(self):
+        self.mongo_commands = 0
+        self.mongo_time_ms = 0.0
+
+
+# Stats for the request being handled, set by MetricsMiddleware
+request_stats_var: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
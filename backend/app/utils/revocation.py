@@ -0,0 +1,105 @@
+import asyncio
+import heapq
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from app.database.connection import get_collection
+from app.models.token_model import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", "15"))
+# Each sync re-reads this far back: revoked_at comes from the writer's clock
+# and is stamped before the insert commits. Re-adding a revocation is harmless.
+REVOCATION_SYNC_OVERLAP_SECONDS = int(os.getenv("REVOCATION_SYNC_OVERLAP_SECONDS", "60"))
+
+
+class RevocationList:
+    """In-memory set of revoked token ids checked on every request.
+
+    Ids are access-token ``jti``s, refresh-token family ids or the ids of
+    deleted members. Each id is kept only until the token it refers to would
+    have expired anyway, so the set stays proportional to recent logouts. It is rebuilt from Mongo at
+    startup and incrementally re-synced so other workers' revocations arrive
+    within ``sync_interval`` seconds, without a database read per request.
+    """
+    def __init__(self, sync_interval=15, overlap=60):
+        self.revoked = {}  # token id -> expiry (epoch seconds)
+        self.expiry_heap = []
+        self.sync_interval = sync_interval
+        self.overlap = overlap
+        self.last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def init(self):
+        """Load unexpired revocations and start syncing"""
+        self.revoked.clear()
+        self.expiry_heap.clear()
+        self.last_sync = None
+        await self.sync()
+        if self._task is None and self.sync_interval > 0:
+            self._task = asyncio.create_task(self._poll())
+        logger.info(f"Loaded {len(self.revoked)} revoked tokens")
+        return self
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def sync(self):
+        """Pull revocations recorded since the last sync"""
+        started = datetime.utcnow()
+        query = {"expires_at": {"$gt": started}}
+        if self.last_sync is not None:
+            query["revoked_at"] = {"$gte": self.last_sync - timedelta(seconds=self.overlap)}
+        cursor = get_collection(RevokedToken).find(query, {"token_id": 1, "expires_at": 1})
+        async for doc in cursor:
+            self._add(doc["token_id"], doc["expires_at"])
+        self.last_sync = started
+        self.prune()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to sync revoked tokens")
+
+    def _add(self, token_id: str, expires_at: datetime):
+        expiry = _epoch(expires_at)
+        if expiry <= self.revoked.get(token_id, 0):
+            return
+        self.revoked[token_id] = expiry
+        heapq.heappush(self.expiry_heap, (expiry, token_id))
+
+    def prune(self):
+        """Forget revocations whose tokens have expired"""
+        now = time.time()
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            expiry, token_id = heapq.heappop(self.expiry_heap)
+            if self.revoked.get(token_id) == expiry:
+                del self.revoked[token_id]
+
+    def is_revoked(self, *token_ids) -> bool:
+        revoked = self.revoked
+        return any(token_id in revoked for token_id in token_ids if token_id)
+
+    async def revoke(self, token_id: str, expires_at: datetime):
+        """Revoke a token id everywhere until ``expires_at``"""
+        self._add(token_id, expires_at)
+        await RevokedToken(token_id=token_id, expires_at=expires_at).insert()
+
+
+def _epoch(value: datetime) -> float:
+    # Token timestamps are naive UTC throughout the app
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+revocation_list = RevocationList(
+    sync_interval=REVOCATION_SYNC_SECONDS,
+    overlap=REVOCATION_SYNC_OVERLAP_SECONDS,
+)
@@ -0,0 +1,34 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    """One TypeAdapter per type; building its validator and serializer is the slow part"""
+    return TypeAdapter(tp)
+
+
+def dump_json(tp, value: Any) -> bytes:
+    """Serialize ``value`` as ``tp`` straight to JSON bytes"""
+    return type_adapter(tp).dump_json(value)
+
+
+def documents_json(model: Type[BaseModel], docs: Iterable[dict]) -> bytes:
+    """Validate raw Mongo documents against ``model`` once and dump them as a JSON array"""
+    adapter = type_adapter(List[model])
+    return adapter.dump_json(adapter.validate_python(list(docs)))
+
+
+def json_response(content: bytes, status_code: int = 200,
+                  headers: Optional[dict] = None) -> Response:
+    """Response for already-serialized JSON; FastAPI skips response_model validation"""
+    return Response(content=content, status_code=status_code,
+                    headers=headers, media_type="application/json")
+
+
+def model_response(tp, value: Any, status_code: int = 200,
+                   headers: Optional[dict] = None) -> Response:
+    """Serialize trusted data as ``tp`` without a second response_model validation"""
+    return json_response(dump_json(tp, value), status_code, headers)
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+from beanie import Document
+from fastapi import HTTPException, status
+from app.database.connection import get_collection
+from app.models.settings_model import AttendanceSettings, SettingsVersion
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_POLL_SECONDS = float(os.getenv("SETTINGS_POLL_SECONDS", "5"))
+
+VERSION_ID = "settings"
+
+
+class SettingsRegistry:
+    """In-memory snapshot of every registered settings document.
+
+    Each settings model is a single-document collection. Reads come straight
+    from the snapshot with no database round trip. Writes go through
+    ``save()``, which bumps a shared version counter; every worker polls that
+    one small document each ``poll_interval`` seconds and reloads the snapshot
+    only when the version has moved.
+    """
+    def __init__(self, poll_interval=5.0):
+        self.poll_interval = poll_interval
+        self.models: List[Type[Document]] = []
+        self.snapshot: Dict[Type[Document], Document] = {}
+        self.version: Optional[int] = None
+        self.reloads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, model: Type[Document]) -> Type[Document]:
+        if model not in self.models:
+            self.models.append(model)
+        return model
+
+    async def init(self):
+        """Load the snapshot and start polling the version counter"""
+        await self.reload()
+        if self._task is None and self.poll_interval > 0:
+            self._task = asyncio.create_task(self._poll())
+        logger.info(f"Loaded {len(self.snapshot)} settings documents at version {self.version}")
+        return self
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _current_version(self) -> int:
+        doc = await get_collection(SettingsVersion).find_one({"_id": VERSION_ID}, {"version": 1})
+        return doc["version"] if doc else 0
+
+    async def reload(self):
+        """Re-read every registered settings document"""
+        # Read the version first: a write landing mid-reload bumps it past this
+        version = await self._current_version()
+        docs = await asyncio.gather(*(model.find_one() for model in self.models))
+        self.snapshot = {
+            model: doc if doc is not None else model()
+            for model, doc in zip(self.models, docs)
+        }
+        self.version = version
+        self.reloads += 1
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if await self._current_version() != self.version:
+                    await self.reload()
+            except Exception:
+                logger.exception("Failed to refresh settings")
+
+    def get(self, model: Type[Document]) -> Document:
+        """Current settings for ``model``, served from memory"""
+        settings = self.snapshot.get(model)
+        if settings is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Settings are still loading, please retry shortly",
+            )
+        return settings
+
+    async def save(self, model: Type[Document], **values) -> Document:
+        """Update the settings document, creating it if needed, and bump the version"""
+        settings = await model.find_one()
+        if settings is None:
+            settings = model(**values)
+            await settings.insert()
+        else:
+            for field, value in values.items():
+                setattr(settings, field, value)
+            await settings.save()
+        self.snapshot[model] = settings
+        # This worker's own version stays behind, so its next poll reloads too
+        await get_collection(SettingsVersion).update_one(
+            {"_id": VERSION_ID},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        return settings
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version or 0,
+            "settings": len(self.snapshot),
+            "reloads": self.reloads,
+        }
+
+
+settings_registry = SettingsRegistry(poll_interval=SETTINGS_POLL_SECONDS)
+settings_registry.register(AttendanceSettings)
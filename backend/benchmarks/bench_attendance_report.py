@@ -0,0 +1,100 @@
+"""Five-year attendance report: raw scan vs daily rollups.
+
+Seeds --checkins check-ins spread over --years of weekly services (tagged
+with a random event id so they can be removed afterwards), rebuilds their
+rollups, then times the same report both ways and checks the totals agree.
+
+Run from the backend directory against a throwaway database:
+
+    MONGO=mongodb://localhost:27017/gpcc_bench python -m benchmarks.bench_attendance_report \\
+        --checkins 1000000 --years 5
+"""
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import main
+from app.database.connection import get_collection, get_db
+from app.database.indexes import sync_indexes
+from app.models.attendance_model import AttendanceCheckIn, AttendanceDaily
+from app.utils.attendance_rollup import attendance_report, rebuild_rollups
+
+ROLES = ["Member", "Visitor", "Staff"]
+AGE_GROUPS = ["child", "youth", "adult", "senior", None]
+
+
+async def seed(count, years, prefix):
+    start = datetime.utcnow() - timedelta(days=365 * years)
+    services = [f"{prefix}-{week}" for week in range(52 * years)]
+    collection = get_collection(AttendanceCheckIn)
+    for offset in range(0, count, 10000):
+        await collection.insert_many([{
+            "member_id": str(ObjectId()),
+            "event_id": random.choice(services),
+            "check_in_time": start + timedelta(seconds=random.randrange(365 * years * 86400)),
+            "role": random.choice(ROLES),
+            "age_group": random.choice(AGE_GROUPS),
+        } for _ in range(min(10000, count - offset))], ordered=False)
+    return start
+
+
+async def raw_report(start, end, prefix):
+    """The report computed straight from attendance_records"""
+    rows = await get_collection(AttendanceCheckIn).aggregate([
+        {"$match": {"check_in_time": {"$gte": start, "$lt": end}, "event_id": {"$regex": f"^{prefix}"}}},
+        {"$group": {"_id": {"$dateTrunc": {"date": "$check_in_time", "unit": "month"}}, "count": {"$sum": 1}}},
+    ], allowDiskUse=True).to_list(None)
+    return sum(row["count"] for row in rows)
+
+
+async def run(args) -> int:
+    await main.startup_event()
+    if not await sync_indexes(get_db()):
+        print("index sync failed; see log")
+        return 1
+    prefix = f"bench-{ObjectId()}"
+    try:
+        start = await seed(args.checkins, args.years, prefix)
+        end = datetime.utcnow()
+        began = time.perf_counter()
+        rollups = await rebuild_rollups(start, end)
+        print(f"rebuilt {rollups} rollups in {time.perf_counter() - began:.1f}s")
+
+        began = time.perf_counter()
+        raw_total = await raw_report(start, end, prefix)
+        raw_ms = (time.perf_counter() - began) * 1000
+
+        timings = []
+        for _ in range(args.repeat):
+            began = time.perf_counter()
+            report = await attendance_report(start, end, None, None, "month")
+            timings.append((time.perf_counter() - began) * 1000)
+        print(f"raw scan     {raw_ms:,.0f}ms  total {raw_total}")
+        print(f"rollups      {min(timings):,.1f}ms best of {args.repeat}  total {report['total']}")
+        ok = report["total"] >= raw_total == args.checkins
+        print("PASS" if ok else "FAIL: totals disagree")
+        return 0 if ok else 1
+    finally:
+        await get_collection(AttendanceCheckIn).delete_many({"event_id": {"$regex": f"^{prefix}"}})
+        await get_collection(AttendanceDaily).delete_many({"event_id": {"$regex": f"^{prefix}"}})
+        await main.shutdown_event()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checkins", type=int, default=200000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    cli()
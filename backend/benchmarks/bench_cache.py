@@ -0,0 +1,47 @@
+"""get/set throughput of MemoryCache against the original SimpleMemoryCache.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_cache --ops 200000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.utils.cache import MemoryCache, SimpleMemoryCache
+
+
+async def bench(label, cache, ops, keys):
+    value = [{"id": i, "title": f"Event {i}", "location": "Main hall"} for i in range(10)]
+    key_names = [f"key:{i}" for i in range(keys)]
+
+    start = time.perf_counter()
+    for i in range(ops):
+        await cache.set(key_names[i % keys], value, 60)
+    set_rate = ops / (time.perf_counter() - start)
+
+    lookups = [random.choice(key_names) for _ in range(ops)]
+    start = time.perf_counter()
+    for key in lookups:
+        await cache.get(key)
+    get_rate = ops / (time.perf_counter() - start)
+
+    print(f"{label:>18}: set {set_rate:12,.0f} ops/s   get {get_rate:12,.0f} ops/s")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+
+    await bench("SimpleMemoryCache", SimpleMemoryCache(max_size=args.keys), args.ops, args.keys)
+    memory_cache = await MemoryCache(max_size=args.keys, sweep_interval=0).init()
+    await bench("MemoryCache", memory_cache, args.ops, args.keys)
+    print(memory_cache.stats())
+    await memory_cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Cold-start timing: import cost and time to first successful response.
+
+Two measurements, both from a fresh interpreter:
+
+* ``--imports`` runs ``python -X importtime -c "import main"`` and prints the
+  slowest modules by cumulative import time.
+* by default, starts ``uvicorn main:app`` and polls ``/health`` and
+  ``/ready`` until each answers 200, reporting the elapsed time from
+  process start.
+
+Run from the backend directory (with MONGODB_URL pointing at a real server):
+
+    python -m benchmarks.bench_cold_start --runs 3
+    python -m benchmarks.bench_cold_start --imports --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def profile_imports(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        return
+    total = max((row[0] for row in rows), default=0)
+    print(f"import main: {total / 1000:.1f}ms cumulative")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+
+def wait_for(url: str, deadline: float) -> float:
+    """Poll ``url`` until it answers 200; returns the monotonic time it did"""
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} did not become available")
+
+
+def measure_once(port: int, timeout: float) -> tuple:
+    env = dict(os.environ, LOG_LEVEL=os.getenv("LOG_LEVEL", "WARNING"))
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = started + timeout
+        healthy = wait_for(f"http://127.0.0.1:{port}/health", deadline)
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", deadline)
+        return healthy - started, ready - started
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--imports", action="store_true", help="profile import time only")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    if args.imports:
+        profile_imports(args.top)
+        return
+
+    for run in range(1, args.runs + 1):
+        healthy, ready = measure_once(args.port, args.timeout)
+        print(f"run {run}: /health {healthy * 1000:.0f}ms  /ready {ready * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Event-loop latency seen by unrelated requests during a login burst.
+
+Fires N concurrent bcrypt verifications the old way (synchronously inside the
+coroutine) and through ``hashing_pool``, while a probe coroutine measures how
+late the loop is to serve a trivial request every few milliseconds.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_login_burst --logins 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.utils.hashing import HashingPool, pwd_context
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def probe(latencies, stop, interval=0.005):
+    """Stand-in for an unrelated endpoint: how late is each scheduled wake-up?"""
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        latencies.append((time.perf_counter() - expected) * 1000)
+
+
+async def sync_login(hashed):
+    pwd_context.verify("correct horse battery staple", hashed)
+
+
+async def pooled_login(pool, hashed):
+    await pool.verify("correct horse battery staple", hashed)
+
+
+async def run(label, make_login, logins):
+    latencies = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(latencies, stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(make_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    print(f"{label:>8}: burst {elapsed:6.2f}s  "
+          f"probe p50 {statistics.median(latencies):8.2f}ms  "
+          f"p99 {percentile(latencies, 99):8.2f}ms  "
+          f"max {max(latencies):8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    hashed = pwd_context.hash("correct horse battery staple", rounds=args.rounds)
+    pool = HashingPool(max_workers=args.workers, max_queue=args.logins)
+    await pool.init()
+
+    await run("before", lambda: sync_login(hashed), args.logins)
+    await run("after", lambda: pooled_login(pool, hashed), args.logins)
+    await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""Per-request overhead of LoggingMiddleware, old vs new.
+
+Drives a trivial Starlette app directly over ASGI (no network), bare and
+wrapped in the previous BaseHTTPMiddleware implementation and in the
+current pure-ASGI one.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.middleware import LoggingMiddleware
+
+logger = logging.getLogger("app.middleware")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware version this replaced, reduced to its costs"""
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        client_ip = request.client.host if request.client else "unknown"
+        logger.info(f"Request: {request.method} {request.url.path} from {client_ip}")
+        if request.method not in ["GET", "HEAD"]:
+            body = await request.body()
+            if body:
+                body_str = body.decode()[:500] + "..." if len(body) > 500 else body.decode()
+                logger.debug(f"Request body: {body_str}")
+        response = await call_next(request)
+        process_time = (time.time() - start_time) * 1000
+        logger.info(f"Response: {response.status_code} (Time: {process_time:.2f}ms)")
+        return response
+
+
+async def echo(request):
+    return JSONResponse({"ok": True})
+
+
+def make_app():
+    return Starlette(routes=[Route("/echo", echo, methods=["GET", "POST"])])
+
+
+async def call(app, method, body):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": "/echo", "raw_path": b"/echo",
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def bench(label, app, requests, method, body):
+    for _ in range(200):
+        await call(app, method, body)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, method, body)
+    per_request = (time.perf_counter() - start) / requests * 1e6
+    print(f"{label:>10} {method:>4}: {per_request:8.1f} us/request")
+    return per_request
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    body = b'{"content": "' + b"x" * 4000 + b'"}'
+    for method in ("GET", "POST"):
+        bare = await bench("bare", make_app(), args.requests, method, body)
+        legacy = await bench("legacy", LegacyLoggingMiddleware(make_app()), args.requests, method, body)
+        current = await bench("asgi", LoggingMiddleware(make_app()), args.requests, method, body)
+        print(f"{'overhead':>10} {method:>4}: legacy {legacy - bare:8.1f} us   asgi {current - bare:8.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
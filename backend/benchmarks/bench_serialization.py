@@ -0,0 +1,133 @@
+"""Serialization throughput for a 1,000-item list, old path vs new.
+
+old: raw document -> Beanie Document -> hand-built response model ->
+     response_model validation -> jsonable dict -> json.dumps
+new: raw document -> projection model via a cached TypeAdapter -> dump_json
+
+No data is read or written, but Beanie's init asks the server for its
+version, so a reachable mongod is needed. Run from the backend directory:
+
+    MONGO=mongodb://localhost:27017/gpcc_bench python -m benchmarks.bench_serialization --items 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from beanie import init_beanie
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import TypeAdapter
+
+from app.models.event_model import Event
+from app.models.member_model import Member
+from app.schemas.event_schema import EventOut
+from app.schemas.member_schema import MemberOut
+from app.utils.projection import parse_fields, projection_model
+from app.utils.serialization import documents_json
+
+
+def raw_events(count):
+    start = datetime(2025, 1, 5, 10, 0)
+    return [{
+        "_id": ObjectId(),
+        "title": f"Sunday service {i}",
+        "description": "Worship, word and fellowship. " * 4,
+        "start_time": start + timedelta(days=7 * i),
+        "end_time": start + timedelta(days=7 * i, hours=2),
+        "location": "Main sanctuary",
+        "event_type": "service",
+        "is_published": True,
+        "created_at": start,
+        "updated_at": start,
+        "registration_required": i % 2 == 0,
+        "max_attendees": 200,
+        "volunteers_needed": True,
+        "volunteer_roles": ["usher", "choir"],
+    } for i in range(count)]
+
+
+def raw_members(count):
+    return [{
+        "_id": ObjectId(),
+        "first_name": f"First{i}",
+        "last_name": f"Last{i}",
+        "email": f"member{i}@example.com",
+        "phone": "5550000000",
+        "role": "Member",
+        "join_date": datetime(2024, 3, 1),
+        "is_active": True,
+        "departments": ["choir"],
+        "password_hash": "$2b$12$" + "x" * 53,
+        "notification_preference": "both",
+        "sms_opt_in": False,
+        "token_version": 0,
+    } for i in range(count)]
+
+
+def old_events(docs, response_adapter):
+    events = [Event.model_validate(doc) for doc in docs]
+    items = [EventOut(id=str(event.id), **event.dict(exclude={"id"})) for event in events]
+    validated = response_adapter.validate_python(items)
+    return json.dumps(response_adapter.dump_python(validated, mode="json")).encode()
+
+
+def old_members(docs, response_adapter):
+    members = [Member.model_validate(doc) for doc in docs]
+    items = [MemberOut(
+        id=str(member.id),
+        first_name=member.first_name,
+        last_name=member.last_name,
+        email=member.email,
+        phone=member.phone,
+        role=member.role,
+        join_date=member.join_date,
+        is_active=member.is_active,
+        departments=member.departments,
+    ) for member in members]
+    validated = response_adapter.validate_python(items)
+    return json.dumps(response_adapter.dump_python(validated, mode="json")).encode()
+
+
+def bench(label, func, rounds):
+    func()  # warm up adapters and caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        body = func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{label:>14}: {elapsed * 1000:8.2f} ms/list   {len(body):>8,} bytes")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    uri = os.getenv("MONGO", "mongodb://localhost:27017/gpcc_bench")
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    await init_beanie(database=client["gpcc_bench"], document_models=[Event, Member],
+                      skip_indexes=True)
+
+    events = raw_events(args.items)
+    members = raw_members(args.items)
+    event_model = projection_model(Event, parse_fields(None, EventOut))
+    member_model = projection_model(Member, parse_fields(None, MemberOut))
+    event_adapter = TypeAdapter(List[EventOut])
+    member_adapter = TypeAdapter(List[MemberOut])
+
+    print(f"{args.items} items, mean of {args.rounds} rounds")
+    old = bench("events old", lambda: old_events(events, event_adapter), args.rounds)
+    new = bench("events new", lambda: documents_json(event_model, events), args.rounds)
+    print(f"{'speedup':>14}: {old / new:.1f}x")
+    old = bench("members old", lambda: old_members(members, member_adapter), args.rounds)
+    new = bench("members new", lambda: documents_json(member_model, members), args.rounds)
+    print(f"{'speedup':>14}: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""Sustained check-ins per second on one worker, Sunday-burst style.
+
+Drives POST /attendance/check-in through the real app over ASGI (no
+network) from --concurrency clients for --seconds, each check-in from a
+different member, then waits for the buffer to drain and verifies every
+accepted check-in reached Mongo exactly once. Tokens carry role claims so
+no member documents are needed.
+
+Run from the backend directory against a throwaway database:
+
+    MONGO=mongodb://localhost:27017/gpcc_load python -m benchmarks.load_checkins \\
+        --seconds 10 --concurrency 50
+"""
+import os
+
+os.environ.setdefault("TOKEN_CLAIMS", "1")
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import sys
+import time
+from collections import Counter
+
+from bson import ObjectId
+
+import main
+from app.database.connection import get_collection, get_db
+from app.database.indexes import sync_indexes
+from app.models.attendance_model import AttendanceCheckIn
+from app.utils.auth import create_access_token
+from app.utils.checkin import checkin_buffer
+from benchmarks.bench_login_burst import percentile
+
+PATH = "/attendance/check-in"
+
+
+async def post(app, token, body):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": PATH, "raw_path": PATH.encode(),
+        "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"load"), (b"content-type", b"application/json"),
+                    (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("load", 80),
+    }
+    status = {}
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return status.get("code"), (time.perf_counter() - start) * 1000
+
+
+async def client(deadline, members, body, statuses, latencies):
+    for member_id in members:
+        if time.perf_counter() >= deadline:
+            return
+        token = create_access_token({"sub": member_id, "ver": 0, "role": "Member",
+                                     "act": True, "dep": []})
+        code, latency = await post(main.app, token, body)
+        statuses[code] += 1
+        latencies.append(latency)
+
+
+async def run(args) -> int:
+    await main.startup_event()
+    if not await sync_indexes(get_db()):
+        print("index sync failed; see log")
+        return 1
+
+    event_id = str(ObjectId())
+    body = json.dumps({"event_id": event_id, "role": "Member", "age_group": "adult"}).encode()
+    member_ids = (str(ObjectId()) for _ in itertools.count())
+    statuses, latencies = Counter(), []
+    try:
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        await asyncio.gather(*(
+            client(deadline, member_ids, body, statuses, latencies)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+        await checkin_buffer.close()
+        drained = time.perf_counter() - start
+
+        stored = await get_collection(AttendanceCheckIn).count_documents({"event_id": event_id})
+        accepted = statuses[202]
+        print(f"{sum(statuses.values())} requests in {elapsed:.1f}s, statuses {dict(statuses)}")
+        print(f"accepted {accepted / elapsed:,.0f}/s  written {stored / drained:,.0f}/s "
+              f"(drained after {drained:.1f}s)")
+        print(f"latency p50 {percentile(latencies, 50):.1f}ms  p95 {percentile(latencies, 95):.1f}ms  "
+              f"max {max(latencies):.1f}ms")
+        print(f"buffer {checkin_buffer.stats()}")
+        ok = accepted == stored
+        print("PASS" if ok else f"FAIL: {accepted} accepted but {stored} stored")
+        return 0 if ok else 1
+    finally:
+        await get_collection(AttendanceCheckIn).delete_many({"event_id": event_id})
+        await main.shutdown_event()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    cli()
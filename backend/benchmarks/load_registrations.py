@@ -0,0 +1,148 @@
+"""Concurrent registrations against a small event must never oversell.
+
+Seeds a published event with --seats seats and --members members, then has
+every member register at once through the real app over ASGI (no network).
+Checks that exactly --seats requests succeed and the rest are waitlisted,
+that registered_count and the registrations collection agree, and reports
+latency percentiles.
+
+Run from the backend directory against a throwaway database:
+
+    MONGO=mongodb://localhost:27017/gpcc_load python -m benchmarks.load_registrations \\
+        --members 500 --seats 100
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import main
+from app.database.connection import get_collection, get_db
+from app.database.indexes import sync_indexes
+from app.models.event_model import Event, EventRegistration, WaitlistEntry
+from app.models.member_model import Member
+from app.utils.auth import create_access_token
+from benchmarks.bench_login_burst import percentile
+
+
+async def post(app, path, token):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"load"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234), "server": ("load", 80),
+    }
+    status = {}
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    start = time.perf_counter()
+    await main.app(scope, receive, send)
+    return status.get("code"), (time.perf_counter() - start) * 1000
+
+
+async def seed(members, seats):
+    now = datetime.utcnow()
+    event_id = ObjectId()
+    await get_collection(Event).insert_one({
+        "_id": event_id, "title": "Load test conference", "description": "load test",
+        "start_time": now + timedelta(days=30), "end_time": now + timedelta(days=30, hours=3),
+        "location": "Main hall", "event_type": "conference", "is_published": True,
+        "created_at": now, "updated_at": now, "registration_required": True,
+        "max_attendees": seats, "registered_count": 0, "volunteers_needed": False,
+        "volunteer_roles": [],
+    })
+    member_ids = [ObjectId() for _ in range(members)]
+    await get_collection(Member).insert_many([{
+        "_id": member_id, "first_name": "Load", "last_name": f"Tester{i}",
+        "email": f"load-{member_id}@example.com", "role": "Member", "join_date": now,
+        "is_active": True, "departments": [], "password_hash": "x",
+        "notification_preference": "both", "sms_opt_in": False, "token_version": 0,
+    } for i, member_id in enumerate(member_ids)])
+    return event_id, member_ids
+
+
+async def cleanup(event_id, member_ids):
+    await get_collection(EventRegistration).delete_many({"event_id": str(event_id)})
+    await get_collection(WaitlistEntry).delete_many({"event_id": str(event_id)})
+    await get_collection(Event).delete_one({"_id": event_id})
+    await get_collection(Member).delete_many({"_id": {"$in": member_ids}})
+
+
+async def run(args) -> int:
+    await main.startup_event()
+    # The unique (event_id, member_id) index must exist before the burst
+    if not await sync_indexes(get_db()):
+        print("index sync failed; see log")
+        return 1
+
+    event_id, member_ids = await seed(args.members, args.seats)
+    try:
+        tokens = [create_access_token({"sub": str(member_id), "ver": 0}) for member_id in member_ids]
+        # Some members double-submit to exercise the duplicate guard
+        tokens += tokens[:args.duplicates]
+        path = f"/events/{event_id}/register"
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(post(main.app, path, token) for token in tokens))
+        elapsed = time.perf_counter() - start
+
+        statuses = Counter(code for code, _ in results)
+        latencies = [latency for _, latency in results]
+        event = await get_collection(Event).find_one({"_id": event_id})
+        stored = await get_collection(EventRegistration).count_documents({"event_id": str(event_id)})
+        waiting = await get_collection(WaitlistEntry).count_documents({"event_id": str(event_id)})
+
+        print(f"{len(tokens)} requests in {elapsed:.2f}s, statuses {dict(statuses)}")
+        print(f"latency p50 {percentile(latencies, 50):.0f}ms  p95 {percentile(latencies, 95):.0f}ms  "
+              f"max {max(latencies):.0f}ms")
+        print(f"registered_count {event['registered_count']}  registrations {stored}  seats {args.seats}")
+        print(f"waitlist_count {event.get('waitlist_count', 0)}  waitlist entries {waiting}")
+
+        # Never oversold, and the counter matches what was stored. A duplicate can
+        # briefly hold a seat before its insert fails, so with duplicates a
+        # concurrent request may be told the event is full.
+        ok = statuses[200] == event["registered_count"] == stored <= args.seats
+        ok = ok and statuses[202] == event.get("waitlist_count", 0) == waiting
+        if not args.duplicates:
+            ok = ok and statuses[200] == min(args.seats, args.members)
+            ok = ok and statuses[202] == max(0, args.members - args.seats)
+        if percentile(latencies, 95) > args.max_p95_ms:
+            print(f"p95 above {args.max_p95_ms}ms")
+            ok = False
+        print("PASS" if ok else "FAIL")
+        return 0 if ok else 1
+    finally:
+        await cleanup(event_id, member_ids)
+        await main.shutdown_event()
+
+
+def cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--seats", type=int, default=100)
+    parser.add_argument("--duplicates", type=int, default=0)
+    parser.add_argument("--max-p95-ms", type=float, default=2000)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,28 +1,34 @@
 import os
+import time
+import asyncio
 import logging
-from fastapi import FastAPI, Depends
 from dotenv import load_dotenv
-from app.database.connection import init_db
-from app.middleware import LoggingMiddleware
+
+# Load .env before app modules read their settings at import time
+load_dotenv()
+
+from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse, JSONResponse
+from app.logging_config import setup_logging, stop_logging
+from app.database.connection import init_db, get_db, ping_db
+from app.database.indexes import dedupe_unique_keys, sync_indexes
+from app.middleware import LoggingMiddleware, MetricsMiddleware
 from app.utils.cache import cache
+from app.utils.hashing import hashing_pool
+from app.utils.auth import token_versions, principal_cache
+from app.utils.metrics import registry, register_stats
+from app.utils.revocation import revocation_list
+from app.utils.registrations import backfill_registered_counts, waitlist_promoter
+from app.utils.checkin import checkin_buffer
+from app.utils.cohorts import cohort_index
+from app.utils.settings_registry import settings_registry
 from app.routes import auth, members, events, attendance, prayer_testimony, announcements
 from app.routes.admin import admin_router
 from fastapi.middleware.cors import CORSMiddleware
 
 
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("app.log")
-    ]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-
-
-load_dotenv()
 logger.info("Environment variables loaded")
 
 app = FastAPI(
@@ -48,6 +54,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination hands the next page's cursor back in this header
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -59,62 +67,107 @@ app.include_router(attendance.router, prefix="/attendance", tags=["Attendance"])
 app.include_router(prayer_testimony.router, prefix="/prayer", tags=["Prayer & Testimony"])
 app.include_router(announcements.router, prefix="/announcements", tags=["Announcements"])
 
-# Add middleware for request logging
-app.add_middleware(LoggingMiddleware)
+# Add middleware for request metrics and logging (logging runs outermost)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(LoggingMiddleware, skip_paths=("/health", "/ready", "/metrics"))
 
-log_config = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "default": {
-            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        }
-    },
-    "handlers": {
-        "console": {
-            "class": "logging.StreamHandler",
-            "formatter": "default",
-            "stream": "ext://sys.stdout"
-        }
-    },
-    "root": {
-        "level": "INFO",
-        "handlers": ["console"]
-    }
-}
-logging.config.dictConfig(log_config)
+register_stats("app_cache", "Application cache counters", cache.stats)
+register_stats("principal_cache", "Authenticated principal cache counters", principal_cache.stats)
+register_stats("hashing_pool", "Password hashing pool counters", hashing_pool.stats)
+register_stats("waitlist_promoter", "Waitlist promotion counters", waitlist_promoter.stats)
+register_stats("checkin_buffer", "Buffered attendance check-in counters", checkin_buffer.stats)
+register_stats("cohort_index", "Attendance bitmap index counters", cohort_index.stats)
+register_stats("settings_registry", "Settings snapshot counters", settings_registry.stats)
 
 
 
+async def prepare_data():
+    """Clear duplicates, build the unique indexes and backfill seat counts before serving"""
+    db = get_db()
+    await dedupe_unique_keys(db)
+    if not await sync_indexes(db, unique_only=True):
+        # Keep serving. Duplicate emails are not ours to merge, so members.email
+        # is the one expected to fail; sign-up still checks for an existing email,
+        # the index only closes the race between concurrent sign-ups
+        logger.error("Some unique indexes could not be built, see the errors above; "
+                     "clear the conflicting rows and restart")
+    await backfill_registered_counts()
 
 
+async def warm_up():
+    """Non-critical startup work, run once the app is already serving"""
+    started = time.perf_counter()
+    app.state.index_sync = "running"
+    app.state.index_sync = "done" if await sync_indexes(get_db()) else "failed"
+    logger.info(f"Deferred startup work finished in {time.perf_counter() - started:.2f}s")
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize application services on startup"""
     logger.info("Starting application initialization...")
+    app.state.ready = False
+    app.state.index_sync = "pending"
+    started = time.perf_counter()
     
     try:
-        await init_db()
-        logger.info("Database initialized successfully")
-        
-        await cache.init()
-        logger.info("Cache initialized successfully")
-        
-        
+        # Independent services come up in parallel
+        await asyncio.gather(init_db(), cache.init(), hashing_pool.init())
+        logger.info(f"Database and cache initialized in {time.perf_counter() - started:.2f}s")
+
+        # Token state must be loaded before any token is trusted, and seats and
+        # duplicates must be enforced before any registration is accepted
+        await asyncio.gather(
+            prepare_data(),
+            token_versions.init(),
+            revocation_list.init(),
+            waitlist_promoter.init(),
+            checkin_buffer.init(),
+            cohort_index.init(),
+            settings_registry.init(),
+        )
     except Exception as e:
         logger.exception(f"Application initialization failed: {str(e)}")
         raise
     else:
-        logger.info("Application startup complete")
+        app.state.ready = True
+        app.state.warm_up = asyncio.create_task(warm_up())
+        logger.info(f"Application startup complete in {time.perf_counter() - started:.2f}s")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up resources on shutdown"""
     logger.info("Shutting down application...")
+    warm_up_task = getattr(app.state, "warm_up", None)
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    # Buffered check-ins are written before anything else goes away
+    await checkin_buffer.close()
+    await cohort_index.close()
     await cache.close()
     logger.info("Cache closed successfully")
+    await hashing_pool.close()
+    await token_versions.close()
+    await revocation_list.close()
+    await waitlist_promoter.close()
+    await settings_registry.close()
+    logger.info("Shutdown complete")
+    stop_logging()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Ready to serve traffic: startup finished and MongoDB reachable"""
+    if not getattr(app.state, "ready", False) or not await ping_db():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", "index_sync": app.state.index_sync}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
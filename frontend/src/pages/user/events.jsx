@@ -8,6 +8,8 @@ export default function Events() {
   const [showVolunteerModal, setShowVolunteerModal] = useState(false);
   const [selectedEvent, setSelectedEvent] = useState(null);
   const [selectedRole, setSelectedRole] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Using environment variable for API base URL
   const API_BASE = import.meta.env.VITE_PUBLIC_API_URL;
@@ -23,6 +25,7 @@ export default function Events() {
       if (response.ok) {
         const data = await response.json();
         setEvents(data);
+        setNextCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Error fetching events:', error);
@@ -31,6 +34,24 @@ export default function Events() {
     }
   };
 
+  // Pages are keyset based: each response names the cursor of the next one
+  const fetchMoreEvents = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await fetch(`${API_BASE}/events/?cursor=${encodeURIComponent(nextCursor)}`);
+      if (response.ok) {
+        const data = await response.json();
+        setEvents((current) => [...current, ...data]);
+        setNextCursor(response.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      console.error('Error fetching more events:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const registerForEvent = async (eventId) => {
     try {
       const token = localStorage.getItem('token');
@@ -41,7 +62,11 @@ export default function Events() {
         }
       });
 
-      if (response.ok) {
+      if (response.status === 202) {
+        // Event is full: the member was added to its waitlist instead
+        const data = await response.json();
+        alert(`This event is full. You are number ${data.position} on the waitlist.`);
+      } else if (response.ok) {
         alert('Successfully registered for the event!');
         fetchEvents(); // Refresh events to update registration status
       } else {
@@ -271,6 +296,18 @@ export default function Events() {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="mt-8 text-center">
+          <button
+            onClick={fetchMoreEvents}
+            disabled={loadingMore}
+            className="bg-white border border-gray-300 text-gray-700 py-2 px-6 rounded-lg hover:bg-gray-50 transition-colors text-sm font-medium disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load More Events'}
+          </button>
+        </div>
+      )}
+
       {/* Volunteer Modal */}
       {showVolunteerModal && selectedEvent && (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex items-center justify-center p-4 z-50">
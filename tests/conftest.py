@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# The application lives in backend/ and imports itself as the top-level `app`
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND)
+
+# Throwaway database for the tests that need a real mongod; dropped before and after
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017/gpcc_test")
+
+
+@pytest.fixture(scope="session")
+def mongo_uri():
+    """URI of an empty local test database; skips the test when no mongod answers"""
+    client = MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"No mongod reachable at {MONGO_TEST_URI}")
+    name = client.get_default_database().name
+    client.drop_database(name)
+    yield MONGO_TEST_URI
+    client.drop_database(name)
+    client.close()
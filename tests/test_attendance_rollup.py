@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from app.utils.attendance_rollup import _left_to_rebuild
+
+CUTOFF = datetime(2026, 3, 1, 10, 0)
+DAY = datetime(2026, 3, 1)
+
+
+def checkin(written_at, check_in_time=CUTOFF):
+    return {"written_at": written_at, "check_in_time": check_in_time}
+
+
+def lease(**fields):
+    rebuild = {"running": True, "start": DAY, "end": DAY + timedelta(days=1), "cutoff": CUTOFF,
+               "until": None, "expires_at": datetime.utcnow() + timedelta(hours=1)}
+    rebuild.update(fields)
+    return rebuild
+
+
+def test_no_rebuild_increments_everything():
+    assert not _left_to_rebuild(None, checkin(CUTOFF))
+
+
+def test_running_rebuild_holds_back_writes_from_its_cutoff():
+    rebuild = lease()
+    assert _left_to_rebuild(rebuild, checkin(CUTOFF + timedelta(seconds=1)))
+    assert not _left_to_rebuild(rebuild, checkin(CUTOFF - timedelta(seconds=1)))
+
+
+def test_running_rebuild_without_cutoff_holds_back_everything_in_range():
+    assert _left_to_rebuild(lease(cutoff=None), checkin(CUTOFF - timedelta(minutes=5)))
+
+
+def test_only_rebuilt_days_are_held_back():
+    later = CUTOFF + timedelta(days=2)
+    assert not _left_to_rebuild(lease(), checkin(CUTOFF + timedelta(seconds=1), check_in_time=later))
+
+
+def test_finished_rebuild_holds_back_only_its_window():
+    rebuild = lease(running=False, until=CUTOFF + timedelta(minutes=1))
+    assert _left_to_rebuild(rebuild, checkin(CUTOFF + timedelta(seconds=30)))
+    assert not _left_to_rebuild(rebuild, checkin(CUTOFF + timedelta(minutes=2)))
+
+
+def test_expired_lease_is_ignored():
+    rebuild = lease(expires_at=datetime.utcnow() - timedelta(seconds=1))
+    assert not _left_to_rebuild(rebuild, checkin(CUTOFF + timedelta(seconds=1)))
+
+
+def test_records_without_write_time_are_incremented():
+    assert not _left_to_rebuild(lease(cutoff=None), checkin(None))
@@ -0,0 +1,187 @@
+import asyncio
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import MemoryCache, cached, invalidate_tags
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(cache_module.cache, "backend", MemoryCache(sweep_interval=0))
+    monkeypatch.setattr(cache_module, "_inflight", {})
+    monkeypatch.setattr(cache_module, "_inflight_tags", {})
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable wall clock for freshness checks"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache_module, "_wall_clock", lambda: now[0])
+    return now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def settle():
+    """Let every ready task run until it blocks"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_misses_share_one_call():
+    calls = []
+
+    @cached(ttl=60)
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key}
+
+    async def scenario():
+        results = await asyncio.gather(*(load("a") for _ in range(50)))
+        assert all(result == {"key": "a"} for result in results)
+        assert calls == ["a"]
+        assert await load("a") == {"key": "a"}
+        assert calls == ["a"]
+        await load("b")
+        assert calls == ["a", "b"]
+    run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_load():
+    calls = []
+
+    @cached(ttl=60)
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        first = asyncio.ensure_future(load())
+        second = asyncio.ensure_future(load())
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "value"
+        assert await load() == "value"
+        assert len(calls) == 1
+    run(scenario())
+
+
+def test_none_results_are_cached():
+    calls = []
+
+    @cached(ttl=60)
+    async def find_nothing():
+        calls.append(1)
+        return None
+
+    async def scenario():
+        assert await find_nothing() is None
+        assert await find_nothing() is None
+        assert len(calls) == 1
+    run(scenario())
+
+
+def test_errors_are_not_cached():
+    calls = []
+
+    @cached(ttl=60)
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database down")
+        return "ok"
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await flaky()
+        assert await flaky() == "ok"
+    run(scenario())
+
+
+def test_stale_value_is_served_while_one_refresh_runs(clock):
+    calls = []
+    release = None
+
+    @cached(ttl=10, stale_ttl=60, jitter=0)
+    async def load():
+        calls.append(1)
+        if len(calls) > 1:
+            await release.wait()
+        return len(calls)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        assert await load() == 1
+
+        clock[0] += 11  # past fresh, within stale
+        stale = await asyncio.gather(*(load() for _ in range(20)))
+        assert stale == [1] * 20
+        await settle()
+        assert len(calls) == 2  # exactly one background refresh
+
+        release.set()
+        await settle()
+        assert await load() == 2
+        assert len(calls) == 2
+    run(scenario())
+
+
+def test_invalidation_voids_loads_already_in_flight():
+    reads = []
+    release = None
+
+    @cached(ttl=300, tags=("events",))
+    async def load_events():
+        version = len(reads)
+        reads.append(version)
+        await release.wait()
+        return version
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        before_write = asyncio.ensure_future(load_events())
+        await asyncio.sleep(0)
+
+        # An admin write lands while the first load is still reading
+        await invalidate_tags("events")
+        after_write = asyncio.ensure_future(load_events())
+        await settle()
+        assert len(reads) == 2  # did not join the stale load
+
+        release.set()
+        assert await before_write == 0
+        assert await after_write == 1
+        # The stale result was never cached
+        assert await load_events() == 1
+        assert len(reads) == 2
+    run(scenario())
+
+
+def test_invalidation_leaves_loads_with_other_tags_alone():
+    reads = []
+    release = None
+
+    @cached(ttl=300, tags=lambda kind: (kind,))
+    async def load(kind):
+        reads.append(kind)
+        await release.wait()
+        return kind
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        prayer = asyncio.ensure_future(load("prayer"))
+        await asyncio.sleep(0)
+        await invalidate_tags("events")
+        joined = asyncio.ensure_future(load("prayer"))
+        release.set()
+        assert await prayer == await joined == "prayer"
+        assert reads == ["prayer"]
+    run(scenario())
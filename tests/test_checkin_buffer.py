@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app.utils import checkin
+from app.utils.checkin import DUPLICATE_KEY, CheckInBuffer
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class Collection:
+    """attendance_records with the (member_id, event_id) unique index"""
+    def __init__(self):
+        self.docs = {}
+        self.cut_off_after = None
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for index, doc in enumerate(docs):
+            if self.cut_off_after is not None and index == self.cut_off_after:
+                self.cut_off_after = None
+                raise asyncio.CancelledError()
+            key = (doc["member_id"], doc["event_id"])
+            if key in self.docs:
+                errors.append({"index": index, "code": DUPLICATE_KEY})
+            else:
+                self.docs[key] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    def find(self, query):
+        ids = set(query["_id"]["$in"])
+        return Cursor([doc for doc in self.docs.values() if doc["_id"] in ids])
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = Collection()
+    monkeypatch.setattr(checkin, "get_collection", lambda model: collection)
+    return collection
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    counted = []
+
+    async def record_checkins(records):
+        counted.extend(record["member_id"] for record in records)
+
+    monkeypatch.setattr(checkin, "record_checkins", record_checkins)
+    monkeypatch.setattr(checkin.cohort_index, "add", lambda records: None)
+    return counted
+
+
+def test_interrupted_flush_counts_every_record_once(collection, counted):
+    async def main():
+        buffer = CheckInBuffer()
+        for member_id in ("a", "b", "c"):
+            buffer.add(member_id, "event", "Member")
+        collection.cut_off_after = 2
+        with pytest.raises(asyncio.CancelledError):
+            await buffer.flush()
+        assert len(buffer.buffer) == 3
+        assert await buffer.flush()
+        return buffer
+
+    buffer = asyncio.run(main())
+    assert sorted(counted) == ["a", "b", "c"]
+    assert buffer.written == 3
+
+
+def test_other_workers_duplicates_are_not_counted(collection, counted):
+    collection.docs[("a", "event")] = {"_id": "elsewhere", "member_id": "a", "event_id": "event"}
+
+    async def main():
+        buffer = CheckInBuffer()
+        buffer.add("a", "event", "Member")
+        buffer.add("b", "event", "Member")
+        assert await buffer.flush()
+
+    asyncio.run(main())
+    assert counted == ["b"]
@@ -0,0 +1,24 @@
+import gzip
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.checkin import decode_ndjson
+
+BODY = b'{"member_id": "a"}\n\n{"member_id": "b"}\n'
+
+
+def test_plain_and_gzipped_bodies_decode_to_lines():
+    assert decode_ndjson(BODY) == decode_ndjson(gzip.compress(BODY), gzipped=True) == [
+        b'{"member_id": "a"}', b'{"member_id": "b"}',
+    ]
+
+
+@pytest.mark.parametrize("body", [
+    gzip.compress(BODY)[:-6],
+    gzip.compress(BODY) + gzip.compress(BODY),
+], ids=["truncated", "second member"])
+def test_incomplete_or_trailing_gzip_is_rejected(body):
+    with pytest.raises(HTTPException) as error:
+        decode_ndjson(body, gzipped=True)
+    assert error.value.status_code == 400
@@ -0,0 +1,26 @@
+import threading
+
+from app.utils.metrics import Counter, Histogram, MetricsRegistry
+
+SERIES_PER_THREAD = 5000
+
+
+def test_render_while_other_threads_add_series():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("commands_total", "Commands", ("command",)))
+    histogram = registry.register(Histogram("wait_seconds", "Wait", ("pool",)))
+
+    def record(thread):
+        for i in range(SERIES_PER_THREAD):
+            counter.inc(f"cmd{thread}-{i}")
+            histogram.observe(f"pool{thread}-{i}", value=0.01)
+
+    threads = [threading.Thread(target=record, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        registry.render()
+    for thread in threads:
+        thread.join()
+
+    assert len(counter.values) == len(histogram.series) == 4 * SERIES_PER_THREAD
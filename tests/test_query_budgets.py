@@ -0,0 +1,89 @@
+"""Hot routes must stay within their Mongo command budgets.
+
+Runs the route handlers against the local test database with the command
+monitor attached and counts what each call sends to Mongo.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from beanie import PydanticObjectId, init_beanie
+from fastapi import Response
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.database import connection
+from app.database.indexes import DOCUMENT_MODELS, sync_indexes
+from app.database.monitoring import assert_max_commands, command_monitor, route_query_budget
+from app.models.event_model import Event
+from app.models.member_model import Member
+from app.routes.admin.members import get_all_members
+from app.routes.events import rsvp_to_event
+
+
+def run_with_db(mongo_uri, monkeypatch, scenario):
+    """Run ``scenario(db)`` with the app's database pointed at a clean test database"""
+    async def main():
+        client = AsyncIOMotorClient(mongo_uri, event_listeners=[command_monitor])
+        db = client.get_default_database()
+        try:
+            for name in await db.list_collection_names():
+                await db[name].delete_many({})
+            await init_beanie(database=db, document_models=DOCUMENT_MODELS, skip_indexes=True)
+            assert await sync_indexes(db)
+            monkeypatch.setattr(connection, "db", db)
+            monkeypatch.setattr(connection, "_read_collections", {})
+            await scenario(db)
+        finally:
+            client.close()
+
+    asyncio.run(main())
+
+
+def member(first_name: str = "Ada") -> Member:
+    return Member(id=PydanticObjectId(), first_name=first_name, last_name="Lovelace",
+                  email=f"{first_name.lower()}@example.com", password_hash="x")
+
+
+async def insert_event(db, max_attendees: int) -> PydanticObjectId:
+    start = datetime.utcnow() + timedelta(days=1)
+    result = await db[Event.get_collection_name()].insert_one({
+        "title": "Retreat", "description": "", "location": "Hall",
+        "start_time": start, "end_time": start + timedelta(hours=2),
+        "is_published": True, "registration_required": True, "max_attendees": max_attendees,
+        "registered_count": 0, "waitlist_seq": 0, "waitlist_count": 0,
+    })
+    return PydanticObjectId(result.inserted_id)
+
+
+def test_rsvp_registration_within_budget(mongo_uri, monkeypatch):
+    async def scenario(db):
+        event_id = await insert_event(db, max_attendees=10)
+        with assert_max_commands(2):
+            result = await rsvp_to_event(event_id, Response(), current_user=member())
+        assert result == {"message": "Successfully registered for event"}
+
+    run_with_db(mongo_uri, monkeypatch, scenario)
+
+
+def test_rsvp_waitlist_within_budget(mongo_uri, monkeypatch):
+    async def scenario(db):
+        event_id = await insert_event(db, max_attendees=1)
+        await rsvp_to_event(event_id, Response(), current_user=member("Ada"))
+        response = Response()
+        with assert_max_commands(route_query_budget(rsvp_to_event)):
+            result = await rsvp_to_event(event_id, response, current_user=member("Grace"))
+        assert response.status_code == 202
+        assert result["position"] == 1
+
+    run_with_db(mongo_uri, monkeypatch, scenario)
+
+
+def test_member_list_is_one_query(mongo_uri, monkeypatch):
+    async def scenario(db):
+        await db[Member.get_collection_name()].insert_many([
+            member(name).model_dump(exclude={"id", "revision_id"}) for name in ("Ada", "Grace", "Alan")
+        ])
+        with assert_max_commands(1):
+            response = await get_all_members(fields=None)
+        assert response.status_code == 200
+
+    run_with_db(mongo_uri, monkeypatch, scenario)
@@ -0,0 +1,81 @@
+"""Hot route queries must be served by the index declared for them.
+
+Syncs the declared indexes into the local test database and explains each
+query behind a hot route; the winning plan must use the expected index and
+never fall back to a COLLSCAN.
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from app.database.indexes import sync_indexes
+from app.database.monitoring import summarize_plan
+from app.models.announcement_model import Announcement
+from app.models.attendance_model import AttendanceCheckIn, AttendanceDaily
+from app.models.event_model import Event, EventRegistration, VolunteerSignup, WaitlistEntry
+from app.models.member_model import Member
+from app.models.prayer_testimony_model import PrayerRequest, Testimony
+from app.models.token_model import RefreshToken, RevokedToken
+
+MEMBER_ID = "64b000000000000000000001"
+EVENT_ID = "64b000000000000000000002"
+NOW = datetime.utcnow()
+
+# (description, model, filter, sort, index the winning plan must use)
+HOT_QUERIES = [
+    ("login / register email lookup", Member, {"email": "someone@example.com"}, None, "email_unique"),
+    ("admin search by role", Member, {"role": "Usher"}, None, "role"),
+    ("upcoming events page", Event,
+     {"is_published": True, "end_time": {"$gte": NOW}, "start_time": {"$lt": NOW}},
+     [("start_time", 1), ("_id", 1)], "published_start_time_id"),
+    ("waitlist sweep", Event, {"waitlist_count": {"$gt": 0}}, None, "waitlisted"),
+    ("registration duplicate check", EventRegistration,
+     {"event_id": EVENT_ID, "member_id": MEMBER_ID}, None, "event_member_unique"),
+    ("registrations for event", EventRegistration, {"event_id": EVENT_ID}, None, "event_member_unique"),
+    ("waitlist head", WaitlistEntry, {"event_id": EVENT_ID}, [("position", 1)], "event_position"),
+    ("volunteer duplicate check", VolunteerSignup,
+     {"event_id": EVENT_ID, "member_id": MEMBER_ID, "role": "usher"}, None, "event_member_role"),
+    ("public prayer feed", PrayerRequest, {"is_public": True, "is_approved": True},
+     [("created_at", -1)], "public_approved_created"),
+    ("approved testimonies", Testimony, {"is_approved": True}, [("created_at", -1)], "approved_created"),
+    ("published announcements", Announcement,
+     {"is_published": True, "expires_at": {"$gt": NOW}}, [("created_at", -1)],
+     "published_expires_created"),
+    ("check-ins for event", AttendanceCheckIn, {"event_id": EVENT_ID}, None, "event"),
+    ("cohort index sync", AttendanceCheckIn, {"written_at": {"$gte": NOW}}, None, "written_at"),
+    ("attendance report days", AttendanceDaily, {"day": {"$gte": NOW, "$lte": NOW}}, None,
+     "day_event_role_age_unique"),
+    ("refresh token claim", RefreshToken, {"jti": "abc", "used_at": None, "revoked": False}, None,
+     "jti_unique"),
+    ("revocation sync", RevokedToken, {"revoked_at": {"$gte": NOW}}, None, "revoked_at"),
+]
+
+
+@pytest.fixture(scope="module")
+def db(mongo_uri):
+    async def sync():
+        client = AsyncIOMotorClient(mongo_uri)
+        try:
+            return await sync_indexes(client.get_default_database())
+        finally:
+            client.close()
+
+    assert asyncio.run(sync()), "index sync failed, see the log"
+    client = MongoClient(mongo_uri)
+    yield client.get_default_database()
+    client.close()
+
+
+@pytest.mark.parametrize("description, model, query, sort, index", HOT_QUERIES,
+                         ids=[row[0] for row in HOT_QUERIES])
+def test_hot_query_uses_its_index(db, description, model, query, sort, index):
+    command = {"find": model.get_collection_name(), "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    plan = summarize_plan(db.command({"explain": command, "verbosity": "queryPlanner"}))
+
+    assert "COLLSCAN" not in plan, f"{description}: {plan}"
+    assert f"IXSCAN({index})" in plan, f"{description}: {plan}"
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from app.utils.cache import MemoryCache, RedisCache, TieredCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def redis_cache(prefix="test:") -> RedisCache:
+    backend = RedisCache(prefix=prefix, default_ttl=60)
+    backend.client = fakeredis.FakeAsyncRedis()
+    return backend
+
+
+class BrokenClient:
+    """Stands in for a Redis server that is down"""
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return fail
+
+    def pipeline(self, *args, **kwargs):
+        raise ConnectionError("redis is down")
+
+
+def test_get_and_set_round_trip_pickled_values():
+    async def scenario():
+        backend = redis_cache()
+        await backend.set("event", {"title": "Sunday service", "seats": [1, 2]})
+        assert await backend.get("event") == {"title": "Sunday service", "seats": [1, 2]}
+        assert await backend.get("missing", "default") == "default"
+        assert await backend.client.ttl("test:event") == 60
+        assert backend.stats()["hits"] == 1 and backend.stats()["misses"] == 1
+    run(scenario())
+
+
+def test_none_is_stored_and_distinct_from_a_miss():
+    async def scenario():
+        backend = redis_cache()
+        await backend.set("empty", None)
+        missing = object()
+        assert await backend.get("empty", missing) is None
+        assert await backend.get("other", missing) is missing
+    run(scenario())
+
+
+def test_get_many_and_set_many():
+    async def scenario():
+        backend = redis_cache()
+        await backend.set_many({"a": 1, "b": 2}, ttl=30)
+        assert await backend.get_many(["a", "b", "c"], default=0) == {"a": 1, "b": 2, "c": 0}
+        assert await backend.get_many([]) == {}
+        assert await backend.client.ttl("test:b") == 30
+    run(scenario())
+
+
+def test_invalidate_tags_removes_only_tagged_keys():
+    async def scenario():
+        backend = redis_cache()
+        await backend.set("event:1", "first", tags=("events", "event:1"))
+        await backend.set_many({"list:a": [1], "list:b": [2]}, tags=("events",))
+        await backend.set("prayer", "keep", tags=("prayer",))
+
+        assert await backend.invalidate_tags(("event:1",)) == 1
+        assert await backend.get("event:1") is None
+        assert await backend.get("list:a") == [1]
+
+        assert await backend.invalidate_tags(("events",)) == 2
+        assert await backend.get_many(["list:a", "list:b"]) == {"list:a": None, "list:b": None}
+        assert await backend.get("prayer") == "keep"
+        assert await backend.invalidate_tags(()) == 0
+    run(scenario())
+
+
+def test_clear_only_touches_its_own_prefix():
+    async def scenario():
+        backend = redis_cache()
+        other = RedisCache(prefix="other:")
+        other.client = backend.client
+        await backend.set("a", 1)
+        await other.set("a", 2)
+        await backend.clear()
+        assert await backend.get("a") is None
+        assert await other.get("a") == 2
+    run(scenario())
+
+
+def test_redis_errors_are_misses_not_failures():
+    async def scenario():
+        backend = RedisCache()
+        backend.client = BrokenClient()
+        await backend.set("a", 1, tags=("t",))
+        assert await backend.get("a", "default") == "default"
+        assert await backend.get_many(["a", "b"], 0) == {"a": 0, "b": 0}
+        assert await backend.invalidate_tags(("t",)) == 0
+        assert await backend.delete("a") is False
+        assert backend.stats()["errors"] == 5
+    run(scenario())
+
+
+def test_tiered_promotes_l2_hits_with_their_tags():
+    async def scenario():
+        shared = redis_cache()
+        writer = TieredCache(MemoryCache(sweep_interval=0), shared)
+        reader = TieredCache(MemoryCache(sweep_interval=0), shared)
+        await writer.set("events", ["service"], ttl=300, tags=("events",))
+
+        assert await reader.get("events") == ["service"]
+        assert await reader.l1.get("events") == ["service"]
+        assert await reader.get_many(["events", "none"]) == {"events": ["service"], "none": None}
+
+        await reader.invalidate_tags(("events",))
+        assert await reader.l1.get("events") is None
+        assert await reader.get("events") is None
+    run(scenario())
@@ -0,0 +1,13 @@
+import pytest
+from fastapi import HTTPException
+
+from app.models.settings_model import AttendanceSettings
+from app.utils.settings_registry import SettingsRegistry
+
+
+def test_get_before_load_is_503():
+    registry = SettingsRegistry(poll_interval=0)
+    registry.register(AttendanceSettings)
+    with pytest.raises(HTTPException) as error:
+        registry.get(AttendanceSettings)
+    assert error.value.status_code == 503
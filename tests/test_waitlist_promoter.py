@@ -0,0 +1,48 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.utils.registrations import WaitlistPromoter
+
+
+def make_promoter(sweep_interval):
+    promoter = WaitlistPromoter(sweep_interval=sweep_interval)
+    calls = {"sweeps": 0, "promoted": []}
+
+    async def sweep():
+        calls["sweeps"] += 1
+
+    async def promote(event_id):
+        calls["promoted"].append(event_id)
+        return 0
+
+    promoter._sweep = sweep
+    promoter.promote = promote
+    return promoter, calls
+
+
+def test_sweeps_on_schedule_despite_steady_notifications():
+    async def main():
+        promoter, calls = make_promoter(sweep_interval=0.05)
+        await promoter.init()
+        for _ in range(30):
+            promoter.notify(ObjectId())
+            await asyncio.sleep(0.01)
+        await promoter.close()
+        return calls
+
+    calls = asyncio.run(main())
+    assert calls["sweeps"] >= 3
+    assert len(calls["promoted"]) == 30
+
+
+def test_close_waits_for_the_loop_to_stop():
+    async def main():
+        promoter, _ = make_promoter(sweep_interval=60)
+        await promoter.init()
+        task = promoter._task
+        await asyncio.sleep(0)
+        await promoter.close()
+        return task
+
+    assert asyncio.run(main()).cancelled()